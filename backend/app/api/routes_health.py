@@ -1,7 +1,17 @@
 from fastapi import APIRouter
 
+from app.db.session import DB_MAX_OVERFLOW, DB_POOL_SIZE, DB_POOL_TIMEOUT, pool_metrics
+
 router = APIRouter()
 
 @router.get("/health")
 def health_check():
     return {"status": "ok"}
+
+@router.get("/metrics/db")
+def db_metrics():
+    """Connection pool and query latency for this worker process (each uvicorn worker has its own)."""
+    return {
+        "config": {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW, "pool_timeout": DB_POOL_TIMEOUT},
+        "engines": pool_metrics(),
+    }
@@ -1,100 +1,188 @@
 import re
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
+import uuid
+from typing import List, Optional
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, inspect, or_, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from app.models.log_entry import LogEntry
-from app.models import LogUpload
-from app.db.session import get_db
-from datetime import datetime
+from app.models import LogAlert, LogCountHourly, LogTemplate, LogUpload
+from app.db.session import get_async_db, get_db
+from app.services.pagination import InvalidCursor, paginate
+from app.services.query_spec import InvalidQuery, LogQuery, criteria, log_query
+from app.services.response_cache import bump_version, cache_version, cached_json
+from app.services.result_cache import result_cache
+from app.services.format_detection import DETECTION_SAMPLE_LINES, detect_format, pinned_parsers
+from app.db.bulk import BulkLogWriter, delete_upload_data
+from app.services.ingestion import IngestStats, ingest_lines
+from app.services.parallel_parse import PARSE_WORKERS, parse_parallel
+from app.services import dedup, keywords, rollup, templates
+from app.services.upload_store import store_upload
+from app.tasks.ingest import ingest_upload
+from app.utils.compression import (
+    DECOMPRESSION_ERRORS,
+    UnsupportedCompression,
+    compression_for,
+    open_decompressed,
+    skip_bytes,
+)
+from app.utils.line_reader import iter_lines
+from datetime import datetime, timedelta
+from itertools import chain, islice
+import os
 
 LOG_REGEX = re.compile(r"(?P<timestamp>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) (?P<level>INFO|WARNING|ERROR|DEBUG) (?P<message>.*)")
 
 router = APIRouter()
 
-from app.utils.log_parsers import ALL_PARSERS
+# Uploads larger than this are handed to Celery workers instead of being parsed in the request
+ASYNC_UPLOAD_THRESHOLD_BYTES = int(os.getenv("ASYNC_UPLOAD_THRESHOLD_BYTES", str(50 * 1024 * 1024)))
+
+
+def _open_content(file: UploadFile, compression, offset=0):
+    """The upload's decompressed content from byte `offset` on, as a forward-only binary stream."""
+    file.file.seek(0 if compression else offset)
+    stream = open_decompressed(file.file, compression)
+    if compression:
+        skip_bytes(stream, offset)
+    return stream
 
 @router.post("/upload-log")
 def upload_log(file: UploadFile = File(...), db: Session = Depends(get_db)):
     """
-    Accepts a .log file, auto-detects among 10 common formats, parses each line, and stores valid entries in the database.
-    Returns the number of lines parsed, lines failed, upload_id, and per-format stats.
+    Accepts a .log file (rotated names such as app.log.1 included), optionally compressed as .gz, .bz2, .xz or .zst, which is
+    decompressed as a stream. Auto-detects among 10 common formats, parses each line, and stores valid entries in the database.
+    Returns the number of lines parsed, lines failed, upload_id, per-format stats and the detected format with its confidence.
+    Files above ASYNC_UPLOAD_THRESHOLD_BYTES (decompressed) are queued for background parsing and return status "queued" with the upload_id.
+    A file identical to an earlier upload returns status "duplicate" with that upload's id and is not ingested again; a file
+    that extends an earlier upload (e.g. app.log after more lines were written) only ingests the bytes past it.
     """
-    import json
     try:
-        if not file.filename.endswith('.log'):
-            raise HTTPException(status_code=400, detail="Only .log files are accepted")
-        content = file.file.read().decode('utf-8')
-        lines = content.splitlines()
-        entries = []
-        failed_lines = []
-        format_counts = {}
-        format_failed = {}
-        tz = pytz.timezone('Asia/Kolkata')
-        # For multiline parsers, buffer lines
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-            matched = False
-            for parser in ALL_PARSERS:
-                if parser.multiline:
-                    # Try up to 10 lines as a block
-                    for j in range(2, min(10, len(lines)-i)+1):
-                        block = lines[i:i+j]
-                        result = parser.match(block)
-                        if result:
-                            norm = parser.normalize(result, file.filename)
-                            entries.append(LogEntry(
-                                timestamp=norm['timestamp'],
-                                level=norm['level'],
-                                message=norm['message'],
-                                source=norm['source'],
-                            ))
-                            format_counts[parser.name] = format_counts.get(parser.name, 0) + 1
-                            i += j-1
-                            matched = True
-                            break
-                    if matched:
-                        break
-                else:
-                    result = parser.match(line)
-                    if result:
-                        norm = parser.normalize(result, file.filename)
-                        entries.append(LogEntry(
-                            timestamp=norm['timestamp'],
-                            level=norm['level'],
-                            message=norm['message'],
-                            source=norm['source'],
-                        ))
-                        format_counts[parser.name] = format_counts.get(parser.name, 0) + 1
-                        matched = True
-                        break
-            if not matched:
-                failed_lines.append(line)
-                # Optionally count which parser failed most on this line
-            i += 1
+        try:
+            compression = compression_for(file.filename)
+        except UnsupportedCompression as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        stats = IngestStats()
+        # Fingerprints the decompressed content; reading it all up front also rejects corrupt archives before any write
+        try:
+            content = dedup.scan(
+                _open_content(file, compression),
+                lambda head_sha256: dedup.prefix_candidates(db, head_sha256),
+            )
+        except DECOMPRESSION_ERRORS as exc:
+            raise HTTPException(status_code=400, detail=f"Could not decompress {file.filename}: {exc}")
+        duplicate = dedup.find_duplicate(db, content)
+        if duplicate is not None:
+            return {
+                "status": "duplicate",
+                "upload_id": str(duplicate.id),
+                "upload_status": duplicate.status,
+                "lines_parsed": duplicate.lines_parsed,
+                "lines_failed_to_parse": duplicate.lines_failed,
+            }
+        # Only the bytes past the longest earlier upload this file extends are ingested, with that upload's
+        # format and parser state (e.g. its CSV header); if it cannot be resumed the whole file is ingested
+        detection = dedup.resume_detection(content)
+        resume = detection is not None
+        skipped = content.base.content_bytes if resume else 0
+        base_upload_id = content.base.id if resume else None
+        ingest_size = content.size - skipped
+        queued = ingest_size > ASYNC_UPLOAD_THRESHOLD_BYTES
         log_upload = LogUpload(
             filename=file.filename,
             uploaded_at=datetime.utcnow(),
-            lines_parsed=len(entries),
-            lines_failed=len(failed_lines)
+            lines_parsed=0,
+            lines_failed=0,
+            status="queued" if queued else "processing",
+            bytes_total=ingest_size,
+            content_sha256=content.sha256,
+            head_sha256=content.head_sha256,
+            content_bytes=content.size,
+            base_upload_id=base_upload_id,
         )
-        db.add(log_upload)
-        db.flush()  # Get log_upload.id
-        for entry in entries:
-            entry.log_upload_id = log_upload.id
-            db.add(entry)
         try:
+            db.add(log_upload)
+            db.flush()  # Get log_upload.id
+            if queued:
+                # Large files are parsed by Celery workers from a decompressed copy; the client polls /uploads/{id}/status
+                store_upload(_open_content(file, compression, skipped), log_upload.id)
+                db.commit()
+                bump_version()
+                ingest_upload.delay(str(log_upload.id))
+                return {
+                    "status": "queued",
+                    "upload_id": str(log_upload.id),
+                    "bytes_total": ingest_size,
+                    "base_upload_id": str(base_upload_id) if base_upload_id else None,
+                }
+            lines = iter_lines(_open_content(file, compression, skipped))
+            if resume:
+                head = []
+                parsers = pinned_parsers(detection, resume=True)
+            else:
+                # Sample the head of the file to pick a format, then try that parser first on every line
+                head = list(islice(lines, DETECTION_SAMPLE_LINES))
+                detection = detect_format(head)
+                parsers = pinned_parsers(detection)
+            # Stream the rest in chunks; the bulk writer commits every INGEST_BATCH_SIZE rows
+            if PARSE_WORKERS > 1:
+                with BulkLogWriter(db, log_upload.id) as writer:
+                    content_stream = _open_content(file, compression, skipped)
+                    for row in parse_parallel(content_stream, file.filename, stats, detection, resume=resume):
+                        writer.add_row(*row)
+            else:
+                ingest_lines(db, log_upload.id, chain(head, lines), file.filename, stats, parsers)
+            log_upload.lines_parsed = stats.lines_parsed
+            log_upload.lines_failed = stats.lines_failed
+            log_upload.status = "completed"
+            log_upload.bytes_processed = ingest_size
+            log_upload.stats = {
+                "base_upload_id": str(base_upload_id) if base_upload_id else None,
+                "bytes_skipped": skipped,
+                "compression": compression,
+                "lines_read": stats.lines_read,
+                "formats_detected": stats.format_counts,
+                "detected_format": detection.format,
+                "format_confidence": round(detection.confidence, 3),
+                "parser_state": detection.parser_state,
+                "lines_failed_examples": stats.failed_examples,
+            }
             db.commit()
-        except Exception as db_exc:
+            result_cache.invalidate()
+            bump_version()
+        except Exception as exc:
+            # Batches may already be committed: record the failure on the upload, then remove what
+            # it wrote so nothing is counted twice when the file is uploaded again
             db.rollback()
-            raise HTTPException(status_code=500, detail=f"DB error: {str(db_exc)}")
+            if inspect(log_upload).persistent:
+                log_upload.status = "failed"
+                log_upload.error = str(exc)
+                db.commit()
+                try:
+                    delete_upload_data(db, log_upload.id)
+                    db.commit()
+                except SQLAlchemyError:
+                    db.rollback()
+                result_cache.invalidate()
+                bump_version()
+            if isinstance(exc, SQLAlchemyError):
+                raise HTTPException(status_code=500, detail=f"DB error: {str(exc)}")
+            raise
         return {
             "status": "success",
-            "lines_parsed": len(entries),
-            "lines_read": len(lines),
-            "lines_failed_to_parse": len(failed_lines),
-            "formats_detected": format_counts,
+            "lines_parsed": stats.lines_parsed,
+            "lines_read": stats.lines_read,
+            "lines_failed_to_parse": stats.lines_failed,
+            "formats_detected": stats.format_counts,
+            "detected_format": detection.format,
+            "format_confidence": round(detection.confidence, 3),
             "upload_id": str(log_upload.id),
-            "lines_failed_examples": failed_lines[:5]
+            "base_upload_id": str(base_upload_id) if base_upload_id else None,
+            "bytes_skipped": skipped,
+            "compression": compression,
+            "lines_failed_examples": stats.failed_examples
         }
     except HTTPException as he:
         raise he
@@ -103,23 +191,75 @@ def upload_log(file: UploadFile = File(...), db: Session = Depends(get_db)):
 
 
 @router.get("/uploads")
-def list_uploads(db: Session = Depends(get_db)):
-    uploads = db.query(LogUpload).order_by(LogUpload.uploaded_at.desc()).all()
+async def list_uploads(request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await cached_json(request, "uploads", None, lambda: _list_uploads(db))
+
+async def _list_uploads(db):
+    uploads = (await db.execute(select(LogUpload).order_by(LogUpload.uploaded_at.desc()))).scalars()
     return [
         {
             "id": str(u.id),
             "filename": u.filename,
             "uploaded_at": u.uploaded_at.isoformat(),
             "lines_parsed": u.lines_parsed,
-            "lines_failed": u.lines_failed
+            "lines_failed": u.lines_failed,
+            "status": u.status
         }
         for u in uploads
     ]
 
 
+@router.get("/uploads/{upload_id}/status")
+def upload_status(upload_id: str, db: Session = Depends(get_db)):
+    """Progress of an upload; background uploads move from queued to processing to completed or failed."""
+    try:
+        upload = db.get(LogUpload, uuid.UUID(upload_id))
+    except ValueError:
+        upload = None
+    if upload is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    progress = 1.0 if upload.status == "completed" else 0.0
+    if upload.status != "completed" and upload.bytes_total:
+        progress = min(upload.bytes_processed / upload.bytes_total, 1.0)
+    return {
+        "id": str(upload.id),
+        "filename": upload.filename,
+        "status": upload.status,
+        "progress": round(progress, 4),
+        "bytes_total": upload.bytes_total,
+        "bytes_processed": upload.bytes_processed,
+        "lines_parsed": upload.lines_parsed,
+        "lines_failed": upload.lines_failed,
+        "content_bytes": upload.content_bytes,
+        "base_upload_id": str(upload.base_upload_id) if upload.base_upload_id else None,
+        "stats": upload.stats,
+        "error": upload.error
+    }
+
+
+def _set_cursor_headers(response, next_cursor, prev_cursor):
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if prev_cursor:
+        response.headers["X-Prev-Cursor"] = prev_cursor
+
+
 @router.get("/uploads/{upload_id}/logs")
-def logs_by_upload(upload_id: str, db: Session = Depends(get_db)):
-    logs = db.query(LogEntry).filter(LogEntry.log_upload_id == upload_id).order_by(LogEntry.timestamp.asc()).all()
+async def logs_by_upload(
+    upload_id: str,
+    response: Response,
+    limit: int = Query(1000, gt=0, le=10000, description="Number of logs to return (default 1000, max 10000)"),
+    cursor: Optional[str] = Query(None, description="Opaque X-Next-Cursor/X-Prev-Cursor value from a previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        stmt = select(LogEntry).where(LogEntry.log_upload_id == uuid.UUID(upload_id))
+        logs, next_cursor, prev_cursor = await paginate(db, stmt, "asc", limit, cursor)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid upload id")
+    _set_cursor_headers(response, next_cursor, prev_cursor)
     return [
         {
             "id": str(l.id),
@@ -133,27 +273,29 @@ def logs_by_upload(upload_id: str, db: Session = Depends(get_db)):
     ]
 
 
-from typing import List, Optional
-from fastapi import Query, Response
 from app.schemas.log_entry import LogEntryRead
-from sqlalchemy import desc, asc, func
-import csv
-import io
+from sqlalchemy import func
 import pytz
 
 @router.get("/logs/summary")
-def logs_summary(db: Session = Depends(get_db)):
+async def logs_summary(request: Request, db: Session = Depends(get_db)):
+    # The rollup queries are sync code shared with other callers; a threadpool worker runs them so
+    # they never block the event loop
+    return await cached_json(request, "summary", None, lambda: run_in_threadpool(_logs_summary, db))
+
+def _logs_summary(db):
     from datetime import datetime, timedelta
-    from collections import OrderedDict
     # Use Asia/Kolkata local timezone for all summaries
     tz = pytz.timezone('Asia/Kolkata')
     levels = ['ERROR', 'WARNING', 'INFO', 'DEBUG']
-    counts_by_level = dict(
-        db.query(LogEntry.level, func.count(LogEntry.id))
-        .filter(LogEntry.level.in_(levels))
-        .group_by(LogEntry.level)
+    # Both aggregates come from the log_counts_hourly rollup, so cost scales with buckets, not rows
+    counts_by_level = {
+        lvl: int(n)
+        for lvl, n in db.query(LogCountHourly.level, func.sum(LogCountHourly.count))
+        .filter(LogCountHourly.level.in_(levels))
+        .group_by(LogCountHourly.level)
         .all()
-    )
+    }
     for lvl in levels:
         counts_by_level.setdefault(lvl, 0)
 
@@ -162,153 +304,101 @@ def logs_summary(db: Session = Depends(get_db)):
     # Round down to the current hour
     now = now.replace(minute=0, second=0, microsecond=0)
     last_24h = now - timedelta(hours=23)
-    # Get all logs in last 24h (in UTC, but convert to local time for bucketing)
-    logs = db.query(LogEntry.timestamp).filter(LogEntry.timestamp >= last_24h.astimezone(pytz.UTC)).all()
-    # Bucket logs by local hour
-    hourly = {}
-    for (ts,) in logs:
-        # Ensure ts is timezone-aware in UTC, then convert to local
-        if ts.tzinfo is None:
-            ts = pytz.UTC.localize(ts)
-        local_ts = ts.astimezone(tz)
-        hour_bucket = local_ts.replace(minute=0, second=0, microsecond=0)
-        hour_str = hour_bucket.strftime('%Y-%m-%d %H:00')
-        hourly[hour_str] = hourly.get(hour_str, 0) + 1
-    # Fill missing hours
-    hours = [ (now - timedelta(hours=i)) for i in reversed(range(24)) ]
-    hourly_filled = OrderedDict()
-    for h in hours:
-        key = h.strftime('%Y-%m-%d %H:00')
-        hourly_filled[key] = hourly.get(key, 0)
+    hourly_filled = rollup.histogram(db, last_24h, now + timedelta(hours=1), tz)
     return { 'counts_by_level': counts_by_level, 'counts_by_hour': hourly_filled }
 
-from datetime import datetime
-from sqlalchemy import or_, and_
 
-from fastapi.responses import StreamingResponse, JSONResponse
-from collections import Counter
-import re
+@router.get("/logs/histogram")
+def logs_histogram(
+    from_date: str = Query(..., description="Start (ISO format); naive values are in the given timezone"),
+    to_date: str = Query(..., description="End, exclusive (ISO format)"),
+    interval: str = Query("hour", pattern="^(hour|day)$"),
+    tz: str = Query("Asia/Kolkata", description="IANA timezone used for bucketing"),
+    level: Optional[str] = Query(None),
+    upload_id: Optional[str] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Entry counts per local hour or day over an arbitrary range, served from the rollup table."""
+    try:
+        zone = pytz.timezone(tz)
+        start, end = (datetime.fromisoformat(v) for v in (from_date, to_date))
+        start, end = (zone.localize(d) if d.tzinfo is None else d for d in (start, end))
+        log_upload_id = uuid.UUID(upload_id) if upload_id else None
+    except (pytz.UnknownTimeZoneError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid histogram parameters: {exc}")
+    if end <= start:
+        raise HTTPException(status_code=400, detail="to_date must be after from_date")
+    if interval == "hour" and end - start > timedelta(days=366):
+        raise HTTPException(status_code=400, detail="Hourly histograms are limited to 366 days")
+    return {
+        'interval': interval,
+        'timezone': tz,
+        'counts': rollup.histogram(db, start, end, zone, interval, level, log_upload_id),
+    }
+
+
+from fastapi.responses import StreamingResponse
+from app.services.export import MEDIA_TYPES, iter_export
+
+async def _log_query(
+    level: Optional[str] = Query(None, description="Filter by log level"),
+    search: Optional[str] = Query(None, description='Full-text search: words, "phrases", prefix*, AND/OR/NOT, -word'),
+    from_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD or ISO format)"),
+    to_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD or ISO format)"),
+    logic: str = Query("AND", regex="^(AND|OR)$", description="Combine filters with AND/OR"),
+) -> LogQuery:
+    try:
+        return log_query(level, search, from_date, to_date, logic)
+    except InvalidQuery as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
 @router.get("/logs/export")
 def export_logs(
-    level: Optional[str] = Query(None),
-    search: Optional[str] = Query(None),
-    from_date: Optional[str] = Query(None),
-    to_date: Optional[str] = Query(None),
-    logic: str = Query("AND", regex="^(AND|OR)$"),
-    format: str = Query("csv", regex="^(csv|json)$"),
+    spec: LogQuery = Depends(_log_query),
+    format: str = Query("csv", regex="^(csv|json|ndjson)$"),
+    gzip: bool = Query(False, description="Send the export with Content-Encoding: gzip"),
     db: Session = Depends(get_db)
 ):
-    filters = []
-    if level:
-        filters.append(LogEntry.level == level)
-    if search:
-        filters.append(LogEntry.message.ilike(f"%{search}%"))
-    if from_date:
-        try:
-            from_dt = datetime.fromisoformat(from_date)
-            filters.append(LogEntry.timestamp >= from_dt)
-        except Exception:
-            pass
-    if to_date:
-        try:
-            to_dt = datetime.fromisoformat(to_date)
-            filters.append(LogEntry.timestamp <= to_dt)
-        except Exception:
-            pass
-    if filters:
-        if logic == "AND":
-            query = db.query(LogEntry).filter(and_(*filters))
-        else:
-            query = db.query(LogEntry).filter(or_(*filters))
-    else:
-        query = db.query(LogEntry)
-    logs = query.order_by(desc(LogEntry.timestamp)).all()
-    # CSV export
-    if format == "csv":
-        def iter_csv():
-            output = io.StringIO()
-            writer = csv.writer(output)
-            writer.writerow(["id", "timestamp", "level", "message", "source", "created_at"])
-            yield output.getvalue()
-            output.seek(0)
-            output.truncate(0)
-            for log in logs:
-                writer.writerow([
-                    log.id,
-                    log.timestamp.isoformat() if log.timestamp else "",
-                    log.level,
-                    log.message,
-                    log.source or "",
-                    log.created_at.isoformat() if log.created_at else "",
-                ])
-                yield output.getvalue()
-                output.seek(0)
-                output.truncate(0)
-        return StreamingResponse(iter_csv(), media_type="text/csv", headers={"Content-Disposition": "attachment; filename=logs.csv"})
-    # JSON export
-    else:
-        data = [
-            {
-                "id": log.id,
-                "timestamp": log.timestamp.isoformat() if log.timestamp else None,
-                "level": log.level,
-                "message": log.message,
-                "source": log.source,
-                "created_at": log.created_at.isoformat() if log.created_at else None,
-            }
-            for log in logs
-        ]
-        return JSONResponse(content=data, headers={"Content-Disposition": "attachment; filename=logs.json"})
+    where = criteria(spec, db.get_bind().dialect.name)
+    headers = {"Content-Disposition": f"attachment; filename=logs.{format}"}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(iter_export(where, format, compress=gzip), media_type=MEDIA_TYPES[format], headers=headers)
 
 @router.get("/logs/report")
-def logs_report(
-    level: Optional[str] = Query(None),
-    search: Optional[str] = Query(None),
-    from_date: Optional[str] = Query(None),
-    to_date: Optional[str] = Query(None),
-    logic: str = Query("AND", regex="^(AND|OR)$"),
-    db: Session = Depends(get_db)
-):
-    filters = []
-    if level:
-        filters.append(LogEntry.level == level)
-    if search:
-        filters.append(LogEntry.message.ilike(f"%{search}%"))
-    if from_date:
-        try:
-            from_dt = datetime.fromisoformat(from_date)
-            filters.append(LogEntry.timestamp >= from_dt)
-        except Exception:
-            pass
-    if to_date:
-        try:
-            to_dt = datetime.fromisoformat(to_date)
-            filters.append(LogEntry.timestamp <= to_dt)
-        except Exception:
-            pass
-    if filters:
-        if logic == "AND":
-            query = db.query(LogEntry).filter(and_(*filters))
-        else:
-            query = db.query(LogEntry).filter(or_(*filters))
-    else:
-        query = db.query(LogEntry)
-    logs = query.order_by(desc(LogEntry.timestamp)).all()
-    # Most frequent log levels
-    level_counts = Counter(log.level for log in logs)
-    most_frequent_levels = level_counts.most_common()
-    # Common keywords
-    keywords = ["timeout", "failed", "crash", "error", "disconnect", "denied", "exception", "restart", "unavailable", "slow", "unreachable"]
-    keyword_counts = Counter()
-    for log in logs:
-        msg = (log.message or "").lower()
-        for kw in keywords:
-            if re.search(rf"\\b{re.escape(kw)}\\b", msg):
-                keyword_counts[kw] += 1
+async def logs_report(request: Request, spec: LogQuery = Depends(_log_query), db: Session = Depends(get_db)):
+    """
+    Level, keyword and template breakdown of the logs matching the filters. Alerts are per-minute
+    aggregates with no message, so `alert_count` applies only the level and date filters (with the
+    same logic) and never `search`; `alert_count_filters` names the filters it did apply.
+    `untagged_entries` counts matching entries stored before keyword tagging, which only keyword
+    rules are counted on until `python -m app.services.keywords backfill` tags them.
+    """
+    # Like /logs/summary, the sync aggregates run on a threadpool worker, off the event loop
+    return await cached_json(request, "report", spec, lambda: run_in_threadpool(_build_report, db, spec))
+
+def _build_report(db, spec):
+    where = criteria(spec, db.get_bind().dialect.name)
+    # Most frequent log levels, counted by the database
+    level_counts = dict(
+        db.query(LogEntry.level, func.count())
+        .filter(where)
+        .group_by(LogEntry.level)
+        .all()
+    )
+    most_frequent_levels = sorted(level_counts.items(), key=lambda kv: kv[1], reverse=True)
+    # Common keywords: tags from the keyword rule set, assigned at ingest
+    keyword_counts, untagged_entries = keywords.tag_counts(db, where)
     common_keywords = keyword_counts.most_common()
+    # Top message templates, from the per-upload counts table when nothing is filtered
+    top_templates = templates.top_templates(db, None if spec == LogQuery(logic=spec.logic) else where)
+    # Rate spikes flagged at ingest for the same levels and time range; search cannot apply to them
+    alert_count_filters = [name for name in ("level", "from_date", "to_date") if getattr(spec, name)]
+    alert_count = db.execute(select(func.count()).select_from(LogAlert).where(_alert_criteria(spec))).scalar()
     # Suggested actions
     suggestions = []
+    if alert_count:
+        suggestions.append(f"{alert_count} log rate spike(s) detected. Review them at /alerts.")
     if level_counts.get("ERROR", 0) > 10:
         suggestions.append("High error volume detected. Investigate recent errors.")
     if keyword_counts.get("timeout", 0) > 0:
@@ -322,45 +412,98 @@ def logs_report(
     return {
         "most_frequent_levels": most_frequent_levels,
         "common_keywords": common_keywords,
+        "top_templates": top_templates,
+        "alert_count": alert_count,
+        "alert_count_filters": alert_count_filters,
+        "untagged_entries": untagged_entries,
         "suggested_actions": suggestions
     }
 
 @router.get("/logs", response_model=List[LogEntryRead])
-def get_logs(
-    level: Optional[str] = Query(None, description="Filter by log level"),
-    search: Optional[str] = Query(None, description="Keyword to search in log message"),
-    from_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD or ISO format)"),
-    to_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD or ISO format)"),
-    logic: str = Query("AND", regex="^(AND|OR)$", description="Combine filters with AND/OR"),
+async def get_logs(
+    response: Response,
+    spec: LogQuery = Depends(_log_query),
     limit: int = Query(100, gt=0, le=1000, description="Number of logs to return (default 100, max 1000)"),
     order: str = Query("desc", regex="^(asc|desc)$", description="Sort order: asc or desc"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque X-Next-Cursor/X-Prev-Cursor value from a previous page"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    filters = []
+    stmt = select(LogEntry).where(criteria(spec, db.get_bind().dialect.name))
+    try:
+        # Cached entries are detached but fully loaded, so they serialize without a session
+        logs, next_cursor, prev_cursor = await result_cache.get_or_compute(
+            ("logs", await cache_version(), spec, limit, order, cursor),
+            lambda: paginate(db, stmt, order, limit, cursor),
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    _set_cursor_headers(response, next_cursor, prev_cursor)
+    return logs
+
+
+
+def _alerts_query(level, source, from_date, to_date, *columns):
+    stmt = select(*columns).select_from(LogAlert)
     if level:
-        filters.append(LogEntry.level == level)
-    if search:
-        filters.append(LogEntry.message.ilike(f"%{search}%"))
+        stmt = stmt.where(LogAlert.level == level)
+    if source:
+        stmt = stmt.where(LogAlert.source == source)
     if from_date:
-        try:
-            from_dt = datetime.fromisoformat(from_date)
-            filters.append(LogEntry.timestamp >= from_dt)
-        except Exception:
-            pass
+        stmt = stmt.where(LogAlert.minute >= from_date)
     if to_date:
-        try:
-            to_dt = datetime.fromisoformat(to_date)
-            filters.append(LogEntry.timestamp <= to_dt)
-        except Exception:
-            pass
-    if filters:
-        if logic == "AND":
-            query = db.query(LogEntry).filter(and_(*filters))
-        else:
-            query = db.query(LogEntry).filter(or_(*filters))
-    else:
-        query = db.query(LogEntry)
-    sort_order = desc(LogEntry.timestamp) if order == "desc" else asc(LogEntry.timestamp)
-    logs = query.order_by(sort_order).limit(limit).all()
-    return logs
+        stmt = stmt.where(LogAlert.minute <= to_date)
+    return stmt
 
+def _alert_criteria(spec):
+    # criteria() for log_alerts: the level and date filters combined with the spec's logic
+    filters = []
+    if spec.level:
+        filters.append(LogAlert.level == spec.level)
+    if spec.from_date:
+        filters.append(LogAlert.minute >= spec.from_date)
+    if spec.to_date:
+        filters.append(LogAlert.minute <= spec.to_date)
+    if not filters:
+        return true()
+    return and_(*filters) if spec.logic == "AND" else or_(*filters)
+
+@router.get("/alerts")
+async def list_alerts(
+    level: Optional[str] = Query(None, description="Only alerts for this level"),
+    source: Optional[str] = Query(None, description="Only alerts for this source"),
+    from_date: Optional[str] = Query(None, description="Alerts for minutes from this date/time (YYYY-MM-DD or ISO 8601)"),
+    to_date: Optional[str] = Query(None, description="Alerts for minutes up to this date/time (YYYY-MM-DD or ISO 8601)"),
+    limit: int = Query(100, gt=0, le=1000, description="Number of alerts to return (default 100, max 1000)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Per-minute rate spikes of (source, level, template) series flagged during ingest, newest
+    minute first. `expected` is the series' smoothed per-minute rate and `score` how many
+    deviations above it the minute's count was when it was flagged.
+    """
+    try:
+        spec = log_query(level=level, from_date=from_date, to_date=to_date)
+    except InvalidQuery as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    stmt = (
+        _alerts_query(spec.level, source, spec.from_date, spec.to_date, LogAlert, LogTemplate.template)
+        .outerjoin(LogTemplate, LogTemplate.id == LogAlert.template_id)
+        .order_by(LogAlert.minute.desc(), LogAlert.detected_at.desc())
+        .limit(limit)
+    )
+    return [
+        {
+            "id": str(a.id),
+            "minute": a.minute.isoformat(),
+            "detected_at": a.detected_at.isoformat(),
+            "source": a.source,
+            "level": a.level,
+            "template_id": a.template_id,
+            "template": template,
+            "count": a.count,
+            "expected": a.expected,
+            "score": a.score,
+            "upload_id": str(a.log_upload_id) if a.log_upload_id else None
+        }
+        for a, template in (await db.execute(stmt)).all()
+    ]
@@ -0,0 +1,186 @@
+import io
+import os
+import uuid
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.log_entry import LogAlert, LogEntry, LogUploadChunk
+from app.services import anomaly, keywords, live, rollup, templates
+
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "5000"))
+
+COPY_COLUMNS = (
+    "id", "timestamp", "level", "message", "source", "tags", "template_id",
+    "created_at", "log_upload_id", "chunk_offset",
+)
+
+
+def _copy_value(value):
+    # PostgreSQL COPY text format: \N is NULL, and backslash, tab, CR and LF must be escaped
+    if value is None:
+        return "\\N"
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif isinstance(value, list):
+        # Array literal; tag names never contain quotes or backslashes, and quoting keeps "null" a string
+        value = "{" + ",".join(f'"{v}"' for v in value) + "}"
+    else:
+        value = str(value)
+    return (
+        value.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class BulkLogWriter:
+    """
+    Streams normalized entries ({timestamp, level, message, source}) into log_entries without
+    building ORM objects. Rows are buffered and written every `batch_size` entries using
+    COPY FROM STDIN on PostgreSQL, or an executemany insert on other backends; each batch is committed
+    together with its log_counts_hourly and log_template_counts increments and any rate-spike
+    alerts the batch raises.
+    """
+    def __init__(self, db: Session, log_upload_id, batch_size=INGEST_BATCH_SIZE, chunk_offset=None):
+        self.db = db
+        self.chunk_offset = chunk_offset
+        self.matcher = keywords.get_matcher()
+        self.miner = templates.get_miner()
+        self.log_upload_id = log_upload_id
+        self.batch_size = batch_size
+        self.rows = []
+        self.rollup_counts = Counter()
+        self.template_counts = Counter()
+        self.clusters = {}
+        self.detector = anomaly.get_detector()
+        self.series_counts = Counter()
+        self.rows_written = 0
+        self.use_copy = db.get_bind().dialect.name == "postgresql"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
+    def add(self, norm):
+        self.add_row(norm['timestamp'], norm['level'], norm['message'], norm['source'])
+
+    def add_row(self, timestamp, level, message, source):
+        cluster = self.miner.add(message)
+        self.clusters[cluster.id] = cluster
+        # Ids stay client-side: live.publish() sends each entry's id as soon as its batch commits,
+        # and COPY cannot hand back ids the database generated
+        self.rows.append((uuid.uuid4(), timestamp, level, message, source, self.matcher.tags(message), cluster.id))
+        self.rollup_counts[(rollup.bucket_start(timestamp), level, self.log_upload_id)] += 1
+        self.template_counts[(self.log_upload_id, cluster.id)] += 1
+        self.series_counts[(anomaly.minute_start(timestamp), source, level, cluster.id)] += 1
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        created_at = datetime.utcnow()
+        if self.use_copy:
+            self._copy(created_at)
+        else:
+            self._executemany(created_at)
+        # Keep log_counts_hourly in step with the rows, in the same transaction
+        rollup.add_counts(self.db, self.rollup_counts)
+        templates.add_counts(self.db, self.template_counts, self.clusters)
+        alerts = self.detector.observe(self.series_counts)
+        if alerts:
+            anomaly.save_alerts(self.db, alerts, self.log_upload_id, self.chunk_offset)
+        self.db.commit()
+        live.publish(self.rows, self.log_upload_id)
+        if alerts:
+            live.publish_alerts(alerts)
+        self.rows_written += len(self.rows)
+        self.rows.clear()
+        self.rollup_counts.clear()
+        self.template_counts.clear()
+        self.clusters.clear()
+        self.series_counts.clear()
+
+    def _copy(self, created_at):
+        buf = io.StringIO()
+        tail = [created_at, self.log_upload_id, self.chunk_offset]
+        for row in self.rows:
+            buf.write("\t".join(_copy_value(v) for v in (*row, *tail)))
+            buf.write("\n")
+        buf.seek(0)
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY log_entries ({', '.join(COPY_COLUMNS)}) FROM STDIN",
+                buf,
+            )
+        finally:
+            cursor.close()
+
+    def _executemany(self, created_at):
+        self.db.execute(
+            insert(LogEntry.__table__),
+            [
+                {
+                    "id": entry_id,
+                    "timestamp": timestamp,
+                    "level": level,
+                    "message": message,
+                    "source": source,
+                    "tags": tags,
+                    "template_id": template_id,
+                    "created_at": created_at,
+                    "log_upload_id": self.log_upload_id,
+                    "chunk_offset": self.chunk_offset,
+                }
+                for entry_id, timestamp, level, message, source, tags, template_id in self.rows
+            ],
+        )
+
+
+def delete_entries(db, log_upload_id, chunk_offset=None):
+    """
+    Deletes an upload's entries, or only those written for one parse_chunk range, and takes them
+    back out of log_counts_hourly and log_template_counts, inside the caller's transaction.
+    Returns the number of entries deleted.
+    """
+    table = LogEntry.__table__
+    where = table.c.log_upload_id == log_upload_id
+    if chunk_offset is not None:
+        where = where & (table.c.chunk_offset == chunk_offset)
+    rollup_counts = Counter()
+    template_counts = Counter()
+    query = select(table.c.timestamp, table.c.level, table.c.template_id).where(where)
+    for timestamp, level, template_id in db.execute(query.execution_options(yield_per=INGEST_BATCH_SIZE)):
+        rollup_counts[(rollup.bucket_start(timestamp), level, log_upload_id)] -= 1
+        if template_id is not None:
+            template_counts[(log_upload_id, template_id)] -= 1
+    if not rollup_counts:
+        return 0
+    rollup.add_counts(db, rollup_counts)
+    templates.add_counts(db, template_counts, {})
+    return db.execute(delete(table).where(where)).rowcount
+
+
+def delete_upload_data(db, log_upload_id, chunk_offset=None):
+    """
+    Removes everything an upload wrote, or only one parse_chunk range of it: its entries (taken
+    back out of log_counts_hourly and log_template_counts), the alerts it raised and its recorded
+    chunk progress, inside the caller's transaction. A failed upload then leaves nothing behind,
+    and a redelivered range can be ingested again without counting anything twice.
+    Returns the number of entries deleted.
+    """
+    deleted = delete_entries(db, log_upload_id, chunk_offset)
+    for model in (LogAlert, LogUploadChunk):
+        where = model.log_upload_id == log_upload_id
+        if chunk_offset is not None:
+            where = where & (model.chunk_offset == chunk_offset)
+        db.execute(delete(model.__table__).where(where))
+    return deleted
@@ -0,0 +1,118 @@
+import bisect
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+# Upper bounds, in milliseconds, of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyStats:
+    """Count, total, max and a fixed-bucket histogram of durations; cheap enough for every query."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def observe(self, ms):
+        with self.lock:
+            self.count += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+            self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+
+    def _quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += n
+            if seen >= rank:
+                return bound
+        return self.max_ms
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "count": self.count,
+                "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+                "max_ms": round(self.max_ms, 3),
+                "p50_ms": self._quantile(0.5) if self.count else 0.0,
+                "p99_ms": self._quantile(0.99) if self.count else 0.0,
+                "buckets_ms": {
+                    **{str(b): n for b, n in zip(LATENCY_BUCKETS_MS, self.buckets)},
+                    "+Inf": self.buckets[-1],
+                },
+            }
+
+
+class PoolMetrics:
+    """
+    Checkout wait, in-use connections and query durations for one engine; call instrument(engine)
+    once after creating it.
+    """
+    def __init__(self):
+        self.checkout_wait = LatencyStats()
+        self.queries = LatencyStats()
+        self.checkout_errors = 0
+        self.engine = None
+
+    def instrument(self, engine):
+        """
+        Times checkouts and records query durations from cursor-execute events on a sync Engine
+        (or AsyncEngine.sync_engine, whose connections are opened through the same connect()).
+        """
+        self.engine = engine
+        queries = self.queries
+        connect = engine.connect
+
+        def timed_connect():
+            # The pool's checkout events fire only once a connection has been handed out, so the
+            # wait for a free (or newly opened) one is timed around the engine's public connect()
+            start = time.perf_counter()
+            try:
+                return connect()
+            except Exception:
+                with self.checkout_wait.lock:
+                    self.checkout_errors += 1
+                raise
+            finally:
+                self.checkout_wait.observe((time.perf_counter() - start) * 1000)
+
+        engine.connect = timed_connect
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            starts = conn.info.get("query_start")
+            if starts:
+                queries.observe((time.perf_counter() - starts.pop()) * 1000)
+
+        @event.listens_for(engine, "handle_error")
+        def _error(context):
+            starts = context.connection.info.get("query_start") if context.connection is not None else None
+            if starts:
+                starts.pop()
+
+    def snapshot(self):
+        data = {
+            "checkout_wait": self.checkout_wait.snapshot(),
+            "checkout_errors": self.checkout_errors,
+            "queries": self.queries.snapshot(),
+        }
+        pool = self.engine.pool if self.engine is not None else None
+        if isinstance(pool, QueuePool):
+            data["pool"] = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            }
+        return data
@@ -1,15 +1,72 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 import os
 
+from app.db.metrics import PoolMetrics
+
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql+psycopg2://postgres:postgres@db:5432/logsentinel")
 
-engine = create_engine(DATABASE_URL)
+# Async drivers for the same database; ASYNC_DATABASE_URL overrides the derived URL
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+# Per-process pool settings; each engine gets its own pool, so a uvicorn worker can hold up to
+# 2 * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections and a Celery worker DB_POOL_SIZE + DB_MAX_OVERFLOW
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+
+def _async_url(url):
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+def _pool_options(url, pool_class):
+    # SQLite keeps SQLAlchemy's default pools, which do not take these settings
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "poolclass": pool_class,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL)
+
+sync_metrics = PoolMetrics()
+async_metrics = PoolMetrics()
+
+engine = create_engine(DATABASE_URL, **_pool_options(DATABASE_URL, QueuePool))
+sync_metrics.instrument(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read endpoints run on the event loop with this engine instead of holding a threadpool worker
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **_pool_options(ASYNC_DATABASE_URL, AsyncAdaptedQueuePool)
+)
+async_metrics.instrument(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def pool_metrics():
+    """Checkout wait, pool occupancy and query latency for both engines of this process."""
+    return {"sync": sync_metrics.snapshot(), "async": async_metrics.snapshot()}
@@ -1,10 +1,11 @@
 import asyncio
-import datetime 
-import random 
+import json
+from typing import Optional
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import routes_health, routes_log
+from app.services import live
 
 app = FastAPI(title="LogSentinel+")
 
@@ -14,69 +15,76 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Prev-Cursor"],
 )
 
 app.include_router(routes_health.router)
 app.include_router(routes_log.router)
 
 # --- WebSocket log streaming ---
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: list[WebSocket] = []
+def _levels(value):
+    if isinstance(value, str):
+        return value.split(",")
+    return value if isinstance(value, list) else None
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-
-    def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except Exception:
-                pass
-
-manager = ConnectionManager()
-
-async def simulate_log_lines():
-    levels = ["INFO", "WARNING", "ERROR", "DEBUG"]
-    messages = [
-        "User logged in",
-        "File uploaded",
-        "Unexpected error occurred",
-        "Connection timeout",
-        "Job started",
-        "Job completed",
-        "Disk space low",
-        "Service restarted",
-        "Configuration updated",
-        "Heartbeat received",
-    ]
-    while True:
-        if manager.active_connections:
-            now = datetime.datetime.utcnow().isoformat()
-            level = random.choice(levels)
-            msg = random.choice(messages)
-            line = f"{now} [{level}] {msg}"
-            await manager.broadcast(line)
-        await asyncio.sleep(random.uniform(1, 3))
+async def _send_frames(websocket: WebSocket, subscription: live.Subscription):
+    # One sender per client, so a slow socket only backs up its own bounded queue; a send that
+    # fails or exceeds LIVE_SEND_TIMEOUT evicts the client. asyncio.timeout rather than wait_for,
+    # which on Python 3.11 can swallow the cancellation of a send that completes at the same time
+    reported = 0
+    try:
+        while True:
+            frame = await subscription.next_frame()
+            async with asyncio.timeout(live.LIVE_SEND_TIMEOUT):
+                if subscription.dropped != reported:
+                    reported = subscription.dropped
+                    await websocket.send_text(json.dumps({"dropped": reported}))
+                await websocket.send_text(frame)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        live.hub.unsubscribe(subscription)
+        try:
+            await websocket.close(code=1011)
+        except Exception:
+            pass
 
 @app.on_event("startup")
-async def start_log_simulator():
-    asyncio.create_task(simulate_log_lines())
+async def start_live_hub():
+    await live.hub.start()
+
+@app.on_event("shutdown")
+async def stop_live_hub():
+    await live.hub.stop()
 
 @app.websocket("/stream-log")
-async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+async def websocket_endpoint(websocket: WebSocket, level: Optional[str] = None, keyword: Optional[str] = None):
+    """
+    Live tail of newly ingested entries as JSON frames: {"entries": [...]} batches coalesced every
+    LIVE_FLUSH_MS, {"alerts": [...]} as soon as ingest flags a rate spike (see GET /alerts), and
+    {"dropped": n} (running total) when this client fell behind. `level` (comma separated) and
+    `keyword` are applied server-side, the keyword to entries only; send
+    {"level": [...], "keyword": "..."} to change them.
+    """
+    await websocket.accept()
+    subscription = live.Subscription(_levels(level), keyword)
+    live.hub.subscribe(subscription)
+    sender = asyncio.create_task(_send_frames(websocket, subscription))
     try:
         while True:
-            await websocket.receive_text()  # Keep connection open, ignore incoming
+            message = await websocket.receive_text()
+            try:
+                filters = json.loads(message)
+            except ValueError:
+                continue
+            if isinstance(filters, dict):
+                subscription.set_filters(_levels(filters.get("level")), filters.get("keyword"))
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
-        
+        pass
+    finally:
+        live.hub.unsubscribe(subscription)
+        sender.cancel()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -1 +1 @@
-from .log_entry import LogEntry, LogUpload
+from .log_entry import LogEntry, LogUpload, LogCountHourly, LogTemplate, LogTemplateCount, LogAlert, LogUploadChunk
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Integer
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, BigInteger, Float, JSON, Index
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -14,8 +14,23 @@ class LogUpload(Base):
     uploaded_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     lines_parsed = Column(Integer, nullable=False)
     lines_failed = Column(Integer, nullable=False)
+    # queued -> processing -> completed | failed; synchronous uploads are stored as completed
+    status = Column(String, default="completed", nullable=False)
+    bytes_total = Column(BigInteger, nullable=True)
+    bytes_processed = Column(BigInteger, default=0, nullable=False)
+    stats = Column(JSON, nullable=True)
+    error = Column(String, nullable=True)
+    # Content fingerprint for deduplication (see app/services/dedup.py). content_bytes is the size of
+    # the whole uploaded file; when it extended base_upload_id, only the bytes past it were ingested.
+    content_sha256 = Column(String(64), nullable=True)
+    head_sha256 = Column(String(64), nullable=True)
+    content_bytes = Column(BigInteger, nullable=True)
+    base_upload_id = Column(UUID(as_uuid=True), ForeignKey('log_uploads.id'), nullable=True)
     log_entries = relationship("LogEntry", back_populates="upload")
 
+Index("ix_log_uploads_content_sha256", LogUpload.content_sha256)
+Index("ix_log_uploads_head_sha256", LogUpload.head_sha256)
+
 class LogEntry(Base):
     __tablename__ = "log_entries"
 
@@ -26,4 +41,76 @@ class LogEntry(Base):
     source = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     log_upload_id = Column(UUID(as_uuid=True), ForeignKey('log_uploads.id'), nullable=True)
+    # Keyword rule tags assigned at ingest (app/services/keywords.py); NULL means not tagged yet
+    tags = Column(ARRAY(String).with_variant(JSON(none_as_null=True), "sqlite"), nullable=True)
+    # Message template mined at ingest (app/services/templates.py); NULL means not assigned yet
+    template_id = Column(BigInteger, nullable=True)
+    # Start of the Celery parse_chunk byte range the entry was written by, so a redelivered chunk
+    # can replace its own rows; NULL for entries ingested in the request
+    chunk_offset = Column(BigInteger, nullable=True)
     upload = relationship("LogUpload", back_populates="log_entries")
+
+class LogCountHourly(Base):
+    """
+    Pre-aggregated entry counts maintained at ingest time (see app/services/rollup.py).
+    Buckets are UTC and 15 minutes wide so they line up with local hours in every
+    real-world timezone offset; rollup queries merge them into hours or days.
+    """
+    __tablename__ = "log_counts_hourly"
+    bucket_start = Column(DateTime, primary_key=True)
+    level = Column(String, primary_key=True)
+    # Entries without an upload are counted under the nil UUID, so there is no foreign key here
+    log_upload_id = Column(UUID(as_uuid=True), primary_key=True)
+    count = Column(BigInteger, default=0, nullable=False)
+
+class LogTemplate(Base):
+    """Latest text of each mined message template; ids are stable hashes (see app/services/templates.py)."""
+    __tablename__ = "log_templates"
+    id = Column(BigInteger, primary_key=True, autoincrement=False)
+    template = Column(String, nullable=False)
+
+class LogTemplateCount(Base):
+    """Entries per template and upload, maintained at ingest time so reports never scan messages."""
+    __tablename__ = "log_template_counts"
+    # Entries without an upload are counted under the nil UUID, as in log_counts_hourly
+    log_upload_id = Column(UUID(as_uuid=True), primary_key=True)
+    template_id = Column(BigInteger, primary_key=True, autoincrement=False)
+    count = Column(BigInteger, default=0, nullable=False)
+
+class LogAlert(Base):
+    """A per-minute rate spike of one (source, level, template) series, raised at ingest (see app/services/anomaly.py)."""
+    __tablename__ = "log_alerts"
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True, nullable=False)
+    detected_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    minute = Column(DateTime, nullable=False)
+    source = Column(String, nullable=True)
+    level = Column(String, nullable=False)
+    template_id = Column(BigInteger, nullable=True)
+    count = Column(Integer, nullable=False)
+    expected = Column(Float, nullable=False)
+    score = Column(Float, nullable=False)
+    log_upload_id = Column(UUID(as_uuid=True), ForeignKey('log_uploads.id'), nullable=True)
+    # parse_chunk range that raised the alert, as on log_entries; NULL outside Celery ingestion
+    chunk_offset = Column(BigInteger, nullable=True)
+
+Index("ix_log_alerts_minute", LogAlert.minute)
+
+class LogUploadChunk(Base):
+    """
+    What one Celery parse_chunk range of an upload has ingested. Written once per range, so a
+    redelivered range replaces its row and the upload's progress is summed from these, never
+    incremented twice (see app/tasks/ingest.py).
+    """
+    __tablename__ = "log_upload_chunks"
+    log_upload_id = Column(UUID(as_uuid=True), ForeignKey('log_uploads.id'), primary_key=True)
+    chunk_offset = Column(BigInteger, primary_key=True, autoincrement=False)
+    bytes_processed = Column(BigInteger, nullable=False)
+    lines_parsed = Column(Integer, nullable=False)
+    lines_failed = Column(Integer, nullable=False)
+
+# Indexes for the /logs, /uploads/{id}/logs, /logs/export and /logs/summary query patterns.
+# Full-text search uses the generated message_tsv column and its GIN index, which exist only in the
+# migrations (migrations/env.py keeps autogenerate from dropping them); see app/services/search.py.
+Index("ix_log_entries_upload_timestamp_id", LogEntry.log_upload_id, LogEntry.timestamp, LogEntry.id)
+Index("ix_log_entries_timestamp_id", LogEntry.timestamp, LogEntry.id)
+Index("ix_log_entries_level_timestamp", LogEntry.level, LogEntry.timestamp)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 from pydantic import BaseModel
 
@@ -15,6 +15,8 @@ class LogEntryCreate(LogEntryBase):
 class LogEntryRead(LogEntryBase):
     id: UUID
     created_at: datetime
+    tags: Optional[List[str]] = None
+    template_id: Optional[int] = None
 
     class Config:
         orm_mode = True
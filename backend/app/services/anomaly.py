@@ -0,0 +1,138 @@
+import math
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from sqlalchemy import insert
+
+from app.models import LogAlert
+
+# Per-minute rates are smoothed with an EWMA of weight ANOMALY_EWMA_ALPHA; a minute is a spike
+# once its count reaches ANOMALY_MIN_COUNT and ANOMALY_Z_THRESHOLD deviations above the mean,
+# after ANOMALY_WARMUP_MINUTES of history. A series silent for ANOMALY_RESET_MINUTES starts over.
+ANOMALY_EWMA_ALPHA = float(os.getenv("ANOMALY_EWMA_ALPHA", "0.1"))
+ANOMALY_Z_THRESHOLD = float(os.getenv("ANOMALY_Z_THRESHOLD", "4"))
+ANOMALY_MIN_COUNT = int(os.getenv("ANOMALY_MIN_COUNT", "20"))
+ANOMALY_WARMUP_MINUTES = int(os.getenv("ANOMALY_WARMUP_MINUTES", "10"))
+ANOMALY_RESET_MINUTES = int(os.getenv("ANOMALY_RESET_MINUTES", "60"))
+# Series tracked per process, least recently updated evicted first
+ANOMALY_MAX_SERIES = int(os.getenv("ANOMALY_MAX_SERIES", "100000"))
+
+_MINUTE = timedelta(minutes=1)
+
+
+def minute_start(ts):
+    return ts.replace(second=0, microsecond=0)
+
+
+class Series:
+    """Fixed-size state of one (source, level, template_id) rate: the open minute and an EWMA of past ones."""
+    __slots__ = ("minute", "count", "mean", "var", "seen", "alerted")
+
+    def __init__(self, minute):
+        self.minute = minute
+        self.count = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self.seen = 0
+        self.alerted = False
+
+    def close_minutes(self, until, alpha):
+        """Folds the open minute, and any empty minutes before `until`, into the EWMA."""
+        gap = int((until - self.minute) / _MINUTE)
+        if gap > ANOMALY_RESET_MINUTES:
+            self.mean = self.var = 0.0
+            self.seen = 0
+        else:
+            for value in [self.count] + [0] * (gap - 1):
+                diff = value - self.mean
+                self.mean += alpha * diff
+                self.var = (1 - alpha) * (self.var + alpha * diff * diff)
+                self.seen += 1
+        self.minute = until
+        self.count = 0
+        self.alerted = False
+
+    def score(self):
+        # Poisson-style floor, so a near-constant history does not make every uptick a spike
+        std = max(math.sqrt(self.var), math.sqrt(self.mean), 1.0)
+        return (self.count - self.mean) / std
+
+
+class AnomalyDetector:
+    """
+    Streaming spike detector over per-minute counts of (source, level, template_id) series, in
+    log time. State is one Series per key, so memory grows with the number of series and is capped
+    at ANOMALY_MAX_SERIES, never with log volume. A minute is flagged as soon as its running count
+    crosses the threshold, at most once per series and minute; counts for minutes older than a
+    series' open minute are ignored. Each process keeps its own state. Thread-safe.
+    """
+    def __init__(
+        self,
+        alpha=ANOMALY_EWMA_ALPHA,
+        z_threshold=ANOMALY_Z_THRESHOLD,
+        min_count=ANOMALY_MIN_COUNT,
+        warmup=ANOMALY_WARMUP_MINUTES,
+        max_series=ANOMALY_MAX_SERIES,
+    ):
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.min_count = min_count
+        self.warmup = warmup
+        self.max_series = max_series
+        self.series = OrderedDict()
+        self.lock = threading.Lock()
+
+    def observe(self, counts):
+        """
+        Feeds a Counter of (minute, source, level, template_id) -> n and returns the alerts raised,
+        as dicts ready for log_alerts.
+        """
+        alerts = []
+        with self.lock:
+            for (minute, source, level, template_id), n in sorted(counts.items(), key=lambda kv: kv[0][0]):
+                key = (source, level, template_id)
+                series = self.series.get(key)
+                if series is None:
+                    series = self.series[key] = Series(minute)
+                    if len(self.series) > self.max_series:
+                        self.series.popitem(last=False)
+                else:
+                    self.series.move_to_end(key)
+                    if minute > series.minute:
+                        series.close_minutes(minute, self.alpha)
+                    elif minute < series.minute:
+                        continue
+                series.count += n
+                if series.alerted or series.seen < self.warmup or series.count < self.min_count:
+                    continue
+                score = series.score()
+                if score >= self.z_threshold:
+                    series.alerted = True
+                    alerts.append({
+                        "minute": minute,
+                        "source": source,
+                        "level": level,
+                        "template_id": template_id,
+                        "count": series.count,
+                        "expected": round(series.mean, 3),
+                        "score": round(score, 3),
+                    })
+        return alerts
+
+
+@lru_cache(maxsize=1)
+def get_detector():
+    """The process-wide detector, so series carry over between uploads handled by one worker."""
+    return AnomalyDetector()
+
+
+def save_alerts(db, alerts, log_upload_id=None, chunk_offset=None):
+    """Inserts alerts from observe() inside the caller's transaction, filling in their id, upload and chunk."""
+    detected_at = datetime.utcnow()
+    for alert in alerts:
+        alert.update(id=uuid.uuid4(), detected_at=detected_at, log_upload_id=log_upload_id, chunk_offset=chunk_offset)
+    db.execute(insert(LogAlert.__table__), alerts)
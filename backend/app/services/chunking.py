@@ -0,0 +1,144 @@
+import io
+import os
+
+from app.services.format_detection import fresh_parsers
+from app.utils.log_parsers import ParserDispatcher
+
+# Give up looking for a safe boundary after this many bytes and let the previous chunk run on
+MAX_BOUNDARY_SCAN = 1024 * 1024
+
+
+class _BoundaryChecker:
+    """
+    Decides whether a file can be cut before a line without breaking a multiline record.
+    A cut is safe after a blank line (every block ends there), or between two complete
+    single-line records: the previous line is parsed by a single-line parser and does not
+    open a block, and the next line is parsed by a single-line parser or opens a block.
+    """
+    def __init__(self, parser_state=None):
+        # Private instances, seeded with the state learned from the file's head (e.g. a CSV header)
+        parsers = fresh_parsers()
+        for p in parsers:
+            if parser_state and p.name in parser_state:
+                p.restore(parser_state[p.name])
+        self.dispatcher = ParserDispatcher(parsers)
+
+    def _single_line(self, line):
+        return any(
+            not p.multiline and p.match(line)
+            for p in self.dispatcher.candidates(line)
+        )
+
+    def _opens_block(self, line):
+        return any(
+            p.multiline and p.starts_block(line)
+            for p in self.dispatcher.candidates(line)
+        )
+
+    def is_boundary(self, prev_line, line):
+        if not prev_line.strip():
+            return True
+        if self._opens_block(prev_line) or not self._single_line(prev_line):
+            return False
+        return self._single_line(line) or self._opens_block(line)
+
+
+def is_boundary(prev_line, line, detection=None):
+    """Whether a file in the format of `detection` can be cut between two consecutive lines."""
+    return _BoundaryChecker(detection.parser_state if detection else None).is_boundary(prev_line, line)
+
+
+def _decode(raw):
+    return raw.decode('utf-8', errors='replace').rstrip('\r\n')
+
+
+def find_split_offsets(path, chunk_bytes, detection=None):
+    """
+    Returns (start, end) byte ranges covering the file, each roughly `chunk_bytes` long,
+    that begin on line boundaries where no multiline record is cut in two. Pass the file's
+    detection so stateful formats (a CSV's rows need its header) are recognized.
+    """
+    size = os.path.getsize(path)
+    checker = _BoundaryChecker(detection.parser_state if detection else None)
+    offsets = [0]
+    with open(path, 'rb') as f:
+        target = chunk_bytes
+        while target < size:
+            f.seek(target)
+            f.readline()  # align to the start of the next line
+            prev = f.readline()
+            found = None
+            while prev and f.tell() - target <= MAX_BOUNDARY_SCAN:
+                pos = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                if checker.is_boundary(_decode(prev), _decode(line)):
+                    found = pos
+                    break
+                prev = line
+            if found is None:
+                # No safe cut near this target; let the current range run on to the next one
+                target += chunk_bytes
+                continue
+            if found >= size:
+                break
+            offsets.append(found)
+            target = found + chunk_bytes
+    offsets.append(size)
+    return list(zip(offsets, offsets[1:]))
+
+
+def iter_aligned_chunks(fileobj, chunk_bytes, detection=None):
+    """
+    Streaming counterpart of find_split_offsets(): yields consecutive byte blocks of roughly
+    `chunk_bytes` from a binary file object, each ending where no multiline record is cut.
+    Like find_split_offsets(), a block with no safe cut near its end runs on into the next one,
+    so a file without any boundary comes out as a single block.
+    """
+    checker = _BoundaryChecker(detection.parser_state if detection else None)
+    carry = b''
+    while True:
+        buf = bytearray(carry)
+        carry = b''
+        eof = False
+        while not carry and not eof:
+            buf += fileobj.read(chunk_bytes)
+            if not buf.endswith(b'\n'):
+                buf += fileobj.readline()
+            prev = bytes(buf[buf.rfind(b'\n', 0, len(buf) - 1) + 1:])
+            scanned = 0
+            while scanned <= MAX_BOUNDARY_SCAN:
+                line = fileobj.readline()
+                if not line:
+                    eof = True
+                    break
+                if checker.is_boundary(_decode(prev), _decode(line)):
+                    carry = line
+                    break
+                buf += line
+                scanned += len(line)
+                prev = line
+        if not buf:
+            return
+        yield bytes(buf)
+
+
+class RangeReader(io.RawIOBase):
+    """Read-only view over bytes [start, end) of a binary file, for iter_lines()."""
+    def __init__(self, f, start, end):
+        self.f = f
+        self.remaining = end - start
+        f.seek(start)
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        return data
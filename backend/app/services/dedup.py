@@ -0,0 +1,134 @@
+import hashlib
+from typing import NamedTuple, Optional
+
+from sqlalchemy import select
+
+from app.models import LogUpload
+from app.services.chunking import is_boundary
+from app.services.format_detection import FormatDetection
+
+# Uploads are matched as prefixes of later ones by the hash of their first DEDUP_HEAD_BYTES, so
+# smaller files are only ever deduplicated as exact copies
+DEDUP_HEAD_BYTES = 64 * 1024
+HASH_CHUNK_BYTES = 1024 * 1024
+BOUNDARY_LINE_BYTES = 64 * 1024
+
+
+class ContentScan(NamedTuple):
+    sha256: str
+    head_sha256: Optional[str]
+    size: int
+    # Longest earlier completed upload whose content is a line-aligned prefix of this one, with
+    # the last line of that prefix and the first line after it (both capped at BOUNDARY_LINE_BYTES)
+    base: Optional[LogUpload] = None
+    base_last_line: bytes = b""
+    tail_first_line: bytes = b""
+
+
+def scan(fileobj, prefix_candidates=lambda head_sha256: []):
+    """
+    Hashes a binary file object from its current position in a single pass. Once the first
+    DEDUP_HEAD_BYTES are read, prefix_candidates(head_sha256) names earlier uploads starting with
+    the same block; the running hash is then snapshotted at each of their sizes, and the longest
+    one whose hash matches and that ends on a line break becomes the scan's base.
+    """
+    total = hashlib.sha256()
+    head_sha256 = None
+    candidates = {}
+    pos = 0
+    last_byte = b""
+    line = b""  # bytes since the last line break, before the current part
+    base = None
+    base_last_line = b""
+    tail_first_line = b""
+    collecting = False  # after a match, until the tail's first line break
+    while True:
+        chunk = fileobj.read(HASH_CHUNK_BYTES)
+        if not chunk:
+            break
+        while chunk:
+            # Hash up to the next point where a snapshot is due
+            stops = [s for s in candidates if s > pos]
+            if head_sha256 is None:
+                stops.append(DEDUP_HEAD_BYTES)
+            take = min([s - pos for s in stops] + [len(chunk)])
+            part, chunk = chunk[:take], chunk[take:]
+            total.update(part)
+            pos += len(part)
+            last_byte = part[-1:]
+            if collecting:
+                end = part.find(b"\n")
+                tail_first_line = (tail_first_line + part[:end if end != -1 else len(part)])[:BOUNDARY_LINE_BYTES]
+                collecting = end == -1
+            if head_sha256 is None and pos == DEDUP_HEAD_BYTES:
+                head_sha256 = total.hexdigest()
+                for upload in prefix_candidates(head_sha256):
+                    candidates.setdefault(upload.content_bytes, []).append(upload)
+            if pos in candidates and last_byte == b"\n":
+                digest = total.copy().hexdigest()
+                for upload in candidates[pos]:
+                    if upload.content_sha256 == digest:
+                        base = upload
+                        start = part.rfind(b"\n", 0, len(part) - 1)
+                        last = part[start + 1:-1] if start != -1 else line + part[:-1]
+                        base_last_line = last[-BOUNDARY_LINE_BYTES:]
+                        tail_first_line = b""
+                        collecting = True
+                        break
+            newline = part.rfind(b"\n")
+            line = (line + part)[-BOUNDARY_LINE_BYTES:] if newline == -1 else part[newline + 1:][-BOUNDARY_LINE_BYTES:]
+    if base is not None and base.content_bytes >= pos:
+        base = None
+    return ContentScan(total.hexdigest(), head_sha256, pos, base, base_last_line, tail_first_line)
+
+
+def resume_detection(content):
+    """
+    The base upload's format detection, with its parser state (e.g. a CSV header), for parsing
+    only the bytes past content.base. None when the tail has to be ingested in full instead: the
+    base kept no parser state, or its last line and the tail's first line could belong to one
+    multiline record.
+    """
+    detection = base_detection(content.base) if content.base is not None else None
+    if detection is None:
+        return None
+    last_line = content.base_last_line.decode("utf-8", errors="replace").rstrip("\r")
+    first_line = content.tail_first_line.decode("utf-8", errors="replace").rstrip("\r")
+    if not is_boundary(last_line, first_line, detection):
+        return None
+    return detection
+
+
+def base_detection(upload):
+    """The FormatDetection an upload was parsed with, as recorded in its stats, or None."""
+    stats = upload.stats or {}
+    if "parser_state" not in stats:
+        return None
+    return FormatDetection(
+        stats.get("detected_format"), stats.get("format_confidence", 0.0), [], stats["parser_state"],
+    )
+
+
+def prefix_candidates(db, head_sha256):
+    """Completed uploads, at least one head block long, whose content starts with the given block."""
+    return db.execute(
+        select(LogUpload).where(
+            LogUpload.head_sha256 == head_sha256,
+            LogUpload.status == "completed",
+            LogUpload.content_bytes > DEDUP_HEAD_BYTES,
+        )
+    ).scalars().all()
+
+
+def find_duplicate(db, content):
+    """The earliest upload with the same content that is not failed, if any."""
+    return db.execute(
+        select(LogUpload)
+        .where(
+            LogUpload.content_sha256 == content.sha256,
+            LogUpload.content_bytes == content.size,
+            LogUpload.status != "failed",
+        )
+        .order_by(LogUpload.uploaded_at)
+        .limit(1)
+    ).scalars().first()
@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+import os
+import zlib
+
+from sqlalchemy import desc, select
+
+from app.db.session import SessionLocal
+from app.models import LogEntry
+
+# Rows fetched per server-side cursor round trip, and the approximate size of each written block
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "5000"))
+EXPORT_BLOCK_BYTES = 256 * 1024
+
+EXPORT_COLUMNS = ("id", "timestamp", "level", "message", "source", "created_at")
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def _csv_rows(rows):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(EXPORT_COLUMNS)
+    for entry_id, timestamp, level, message, source, created_at in rows:
+        writer.writerow([entry_id, _iso(timestamp) or "", level, message, source or "", _iso(created_at) or ""])
+        if output.tell() >= EXPORT_BLOCK_BYTES:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+    yield output.getvalue()
+
+
+def _json_objects(rows):
+    for entry_id, timestamp, level, message, source, created_at in rows:
+        yield json.dumps({
+            "id": str(entry_id),
+            "timestamp": _iso(timestamp),
+            "level": level,
+            "message": message,
+            "source": source,
+            "created_at": _iso(created_at),
+        })
+
+
+def _blocks(pieces):
+    # Join small pieces into ~EXPORT_BLOCK_BYTES writes so each chunk is worth a socket send
+    block, size = [], 0
+    for piece in pieces:
+        block.append(piece)
+        size += len(piece)
+        if size >= EXPORT_BLOCK_BYTES:
+            yield "".join(block)
+            block, size = [], 0
+    if block:
+        yield "".join(block)
+
+
+def _ndjson_rows(rows):
+    return _blocks(obj + "\n" for obj in _json_objects(rows))
+
+
+def _json_rows(rows):
+    def pieces():
+        yield "["
+        for i, obj in enumerate(_json_objects(rows)):
+            yield obj if i == 0 else "," + obj
+        yield "]"
+    return _blocks(pieces())
+
+
+FORMATTERS = {"csv": _csv_rows, "json": _json_rows, "ndjson": _ndjson_rows}
+
+
+def iter_export(criteria, fmt, compress=False):
+    """
+    Streams matching log entries, newest first, as CSV, a JSON array or NDJSON.
+    Rows are read as column tuples through a server-side cursor in EXPORT_BATCH_ROWS batches,
+    so memory stays bounded; the generator owns its session because it outlives the request handler.
+    """
+    db = SessionLocal()
+    try:
+        query = (
+            select(*(getattr(LogEntry, c) for c in EXPORT_COLUMNS))
+            .where(criteria)
+            .order_by(desc(LogEntry.timestamp))
+            .execution_options(stream_results=True, yield_per=EXPORT_BATCH_ROWS)
+        )
+        rows = db.execute(query)
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None  # wbits=31: gzip framing
+        for block in FORMATTERS[fmt](rows):
+            data = block.encode("utf-8")
+            if compressor is not None:
+                data = compressor.compress(data)
+            if data:
+                yield data
+        if compressor is not None:
+            yield compressor.flush()
+    finally:
+        db.close()
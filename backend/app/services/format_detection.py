@@ -0,0 +1,54 @@
+from collections import namedtuple
+
+from app.services.ingestion import IngestStats, parse_lines
+from app.utils.log_parsers import ALL_PARSERS
+
+DETECTION_SAMPLE_LINES = 200
+# Mixed-format files keep the default priority order; pinning only pays off for a dominant format
+MIN_PIN_CONFIDENCE = 0.5
+
+# parser_state maps parser name -> state learned from the sample, for resuming mid-file
+FormatDetection = namedtuple("FormatDetection", ["format", "confidence", "ranking", "parser_state"])
+
+
+def fresh_parsers(parsers=ALL_PARSERS):
+    # Parsers such as CSVLogParser keep per-file state, so each file gets its own instances
+    return [type(p)() for p in parsers]
+
+
+def detect_format(sample_lines, parsers=ALL_PARSERS):
+    """
+    Runs the full parser list over a sample from the head of a file and ranks formats by
+    the share of sampled records they parsed. Returns the winning format (or None) and its confidence.
+    """
+    stats = IngestStats()
+    sample_parsers = fresh_parsers(parsers)
+    for _ in parse_lines(sample_lines, "", stats, sample_parsers):
+        pass
+    parser_state = {p.name: p.state() for p in sample_parsers if p.state() is not None}
+    records = stats.lines_parsed + stats.lines_failed
+    ranking = sorted(
+        ((name, count / records) for name, count in stats.format_counts.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    if not ranking:
+        return FormatDetection(None, 0.0, [], parser_state)
+    return FormatDetection(ranking[0][0], ranking[0][1], ranking, parser_state)
+
+
+def pinned_parsers(detection, parsers=ALL_PARSERS, resume=False):
+    """
+    Returns fresh parser instances with the detected format tried first; the rest keep
+    their priority order and are only reached by lines the pinned parser misses.
+    With resume=True the state learned from the sample is restored, for parsing a later part of the file.
+    """
+    parsers = fresh_parsers(parsers)
+    if resume:
+        for p in parsers:
+            if p.name in detection.parser_state:
+                p.restore(detection.parser_state[p.name])
+    if detection.confidence < MIN_PIN_CONFIDENCE:
+        return parsers
+    pinned = [p for p in parsers if p.name == detection.format]
+    return pinned + [p for p in parsers if p.name != detection.format]
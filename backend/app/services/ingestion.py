@@ -0,0 +1,133 @@
+from collections import deque
+
+from app.db.bulk import BulkLogWriter
+from app.utils.log_parsers import ALL_PARSERS, BaseLogParser, Block, ParserDispatcher
+
+
+class IngestStats:
+    """Running counters for one upload; only a handful of failed lines are kept as examples."""
+    def __init__(self, max_failed_examples=5):
+        self.lines_read = 0
+        self.lines_parsed = 0
+        self.lines_failed = 0
+        self.format_counts = {}
+        self.failed_examples = []
+        self.max_failed_examples = max_failed_examples
+
+    def record_parsed(self, parser_name):
+        self.lines_parsed += 1
+        self.format_counts[parser_name] = self.format_counts.get(parser_name, 0) + 1
+
+    def record_failed(self, line):
+        self.lines_failed += 1
+        if len(self.failed_examples) < self.max_failed_examples:
+            self.failed_examples.append(line)
+
+    def to_dict(self):
+        return {
+            "lines_read": self.lines_read,
+            "lines_parsed": self.lines_parsed,
+            "lines_failed": self.lines_failed,
+            "format_counts": self.format_counts,
+            "failed_examples": self.failed_examples,
+        }
+
+    def merge(self, other):
+        """Folds in another part's to_dict() output; parts must be merged in file order."""
+        self.lines_read += other["lines_read"]
+        self.lines_parsed += other["lines_parsed"]
+        self.lines_failed += other["lines_failed"]
+        for name, count in other["format_counts"].items():
+            self.format_counts[name] = self.format_counts.get(name, 0) + count
+        room = self.max_failed_examples - len(self.failed_examples)
+        self.failed_examples.extend(other["failed_examples"][:max(room, 0)])
+
+
+class BlockReader:
+    """
+    Line iterator with push-back. Multiline parsers read ahead while their continuation rule
+    holds and hand back whatever they did not consume, so every line is assembled into at most
+    one block and no fixed lookahead window is needed.
+    """
+    def __init__(self, lines, stats):
+        self.lines = iter(lines)
+        self.pending = deque()
+        self.stats = stats
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.pending:
+            return self.pending.popleft()
+        line = next(self.lines)
+        self.stats.lines_read += 1
+        return line
+
+    def push_back(self, lines):
+        self.pending.extendleft(reversed(lines))
+
+    def read_block(self, parser, first_line, starts_record=None):
+        """
+        Collects the block `first_line` opens. Besides the parser's own rule, a block ends at an
+        unindented line for which starts_record(line, parser) says another parser would begin a
+        record, so free-text continuations cannot swallow the next entry.
+        """
+        block = Block([first_line])
+        for line in self:
+            if not parser.continues_block(block, line) or (
+                starts_record is not None and not line.startswith((' ', '\t')) and starts_record(line, parser)
+            ):
+                self.push_back([line])
+                break
+            block.append(line)
+        return block
+
+
+def parse_lines(lines, filename, stats, parsers=ALL_PARSERS):
+    """
+    Parses an iterable of lines and yields normalized entries ({timestamp, level, message, source}).
+    Multiline records are assembled in a single streaming pass, so the input can be arbitrarily long.
+    """
+    reader = BlockReader(lines, stats)
+    dispatcher = ParserDispatcher(parsers)
+    # Parsers with per-file state are left out: probing CSVLogParser with a header-like line would
+    # make it adopt that line as its header
+    probe = ParserDispatcher([p for p in parsers if type(p).restore is BaseLogParser.restore])
+
+    def starts_record(line, current):
+        return any(
+            p is not current and (p.starts_block(line) if p.multiline else p.match(line))
+            for p in probe.candidates(line)
+        )
+
+    for line in reader:
+        matched = False
+        for parser in dispatcher.candidates(line):
+            if parser.multiline:
+                if not parser.starts_block(line):
+                    continue
+                block = reader.read_block(parser, line, starts_record)
+                result = parser.match(block)
+                if result:
+                    yield parser.normalize(result, filename)
+                    stats.record_parsed(parser.name)
+                    matched = True
+                    break
+                reader.push_back(block[1:])
+            else:
+                result = parser.match(line)
+                if result:
+                    yield parser.normalize(result, filename)
+                    stats.record_parsed(parser.name)
+                    matched = True
+                    break
+        if not matched:
+            stats.record_failed(line)
+
+
+def ingest_lines(db, log_upload_id, lines, filename, stats, parsers=ALL_PARSERS, chunk_offset=None):
+    """Parses `lines` and streams the entries into log_entries for the given upload."""
+    with BulkLogWriter(db, log_upload_id, chunk_offset=chunk_offset) as writer:
+        for norm in parse_lines(lines, filename, stats, parsers):
+            writer.add(norm)
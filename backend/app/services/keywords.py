@@ -0,0 +1,189 @@
+import argparse
+import json
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+
+from sqlalchemy import and_, bindparam, func, or_, select, true
+
+from app.models import LogEntry
+
+# JSON list of rules, e.g. [{"tag": "timeout", "keyword": "timeout"},
+# {"tag": "oom", "pattern": "out of memory|oom-?kill"}]; defaults to DEFAULT_KEYWORDS
+KEYWORD_RULES_FILE = os.getenv("KEYWORD_RULES_FILE")
+DEFAULT_KEYWORDS = [
+    "timeout", "failed", "crash", "error", "disconnect", "denied",
+    "exception", "restart", "unavailable", "slow", "unreachable",
+]
+BACKFILL_BATCH_ROWS = 5000
+
+_WORD = re.compile(r"\w+")
+_TAG_NAME = re.compile(r"^[A-Za-z0-9_.-]+$")
+# A pattern without alternation that starts with an unquantified letter or digit, after an
+# optional \b, can only match starting with that character
+_LEADING_CHAR = re.compile(r"(?:\\b)?([A-Za-z0-9])(?![*+?{])")
+
+
+class KeywordMatcher:
+    """
+    Tags a message with every rule it matches, in a single pass over the text whatever the
+    number of rules. Single-word keywords are looked up in a dict from the message's words
+    (case-insensitive, whole words). Multi-word keywords and regex patterns are compiled into one
+    non-capturing alternation scanned with finditer, where patterns that must start with a given
+    letter or digit are grouped behind a lookahead on it, so each position only tries the
+    patterns that can start there; only at a hit are the candidate rules matched one by one.
+    The scan reports non-overlapping matches, so a pattern that only matches inside text already
+    matched by another one is not reported.
+    """
+    def __init__(self, rules):
+        self.words = {}
+        # Keyword rules' normalized keywords by tag, for counting in SQL (see tag_counts)
+        self.keywords = {}
+        # Compiled regex rules by the character their matches must start with; None for the rest
+        self.candidates = {}
+        for rule in rules:
+            tag = rule["tag"]
+            if not _TAG_NAME.match(tag):
+                raise ValueError(f"Invalid tag name: {tag!r}")
+            if "keyword" in rule:
+                keyword = rule["keyword"].strip().lower()
+                self.keywords.setdefault(tag, []).append(keyword)
+                if _WORD.fullmatch(keyword):
+                    self.words.setdefault(keyword, []).append(tag)
+                    continue
+                pattern = r"\b" + r"\s+".join(re.escape(w) for w in keyword.split()) + r"\b"
+            else:
+                pattern = rule["pattern"]
+            # Compiling each rule on its own also reports a bad pattern against its rule
+            compiled = re.compile(pattern, re.IGNORECASE)
+            lead = _LEADING_CHAR.match(pattern) if "|" not in pattern else None
+            key = lead.group(1).lower() if lead else None
+            self.candidates.setdefault(key, []).append((tag, compiled))
+        self.others = self.candidates.pop(None, [])
+        self.all_rules = [pair for group in self.candidates.values() for pair in group] + self.others
+        branches = [
+            f"(?={re.escape(char)})(?:{'|'.join(f'(?:{rx.pattern})' for _, rx in group)})"
+            for char, group in self.candidates.items()
+        ]
+        branches.extend(f"(?:{rx.pattern})" for _, rx in self.others)
+        self.regex = re.compile("|".join(branches), re.IGNORECASE) if branches else None
+        self.word_set = frozenset(self.words)
+
+    def tags(self, message):
+        """Sorted, de-duplicated tags of the rules matching `message`."""
+        found = set()
+        if self.word_set:
+            for word in self.word_set.intersection(_WORD.findall(message.lower())):
+                found.update(self.words[word])
+        if self.regex is not None:
+            for match in self.regex.finditer(message):
+                start = match.start()
+                group = self.candidates.get(message[start:start + 1].lower())
+                # Characters that only case-fold onto a group's key (e.g. the long s) try every rule
+                for tag, rx in group + self.others if group is not None else self.all_rules:
+                    if tag not in found and rx.match(message, start):
+                        found.add(tag)
+        return sorted(found)
+
+
+def load_rules(path=None):
+    path = path or KEYWORD_RULES_FILE
+    if not path:
+        return [{"tag": kw, "keyword": kw} for kw in DEFAULT_KEYWORDS]
+    with open(path) as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=1)
+def get_matcher():
+    """The process-wide matcher for the configured rule set."""
+    return KeywordMatcher(load_rules())
+
+
+def _keyword_match(keyword, dialect_name):
+    # Case-insensitive whole-word match; \m and \M are PostgreSQL's word boundaries
+    if dialect_name == "postgresql":
+        return LogEntry.message.op("~*")(r"\m" + r"\s+".join(re.escape(w) for w in keyword.split()) + r"\M")
+    return LogEntry.message.icontains(keyword, autoescape=True)
+
+
+def tag_counts(db, where):
+    """
+    Returns (Counter of tag -> matching entries under `where`, number of untagged entries), all
+    counted by the database. Tagged entries are counted from their tags; entries stored before
+    tagging get one conditional count per keyword rule's tag over their messages. Pattern rules
+    cannot be run by the database, so they reach those entries only once the backfill command
+    has tagged them; the untagged count says how many that is.
+    """
+    dialect = db.get_bind().dialect.name
+    counts = Counter()
+    tagged = and_(where, LogEntry.tags.isnot(None))
+    if dialect == "postgresql":
+        tags = select(func.unnest(LogEntry.tags).label("tag")).where(tagged).subquery()
+    else:
+        # SQLite stores the tags as a JSON array (see the model); json_each() unnests it
+        elements = func.json_each(LogEntry.tags).table_valued("value")
+        tags = (
+            select(elements.c.value.label("tag"))
+            .select_from(LogEntry.__table__.join(elements, true()))
+            .where(tagged)
+            .subquery()
+        )
+    counts.update(dict(db.execute(select(tags.c.tag, func.count()).group_by(tags.c.tag)).all()))
+    keyword_tags = list(get_matcher().keywords.items())
+    untagged, *keyword_counts = db.execute(
+        select(
+            func.count(),
+            *[func.count().filter(or_(*[_keyword_match(kw, dialect) for kw in kws])) for _, kws in keyword_tags],
+        ).where(and_(where, LogEntry.tags.is_(None)))
+    ).one()
+    counts.update({tag: n for (tag, _), n in zip(keyword_tags, keyword_counts) if n})
+    return counts, untagged
+
+
+def backfill(db, retag=False):
+    """
+    Tags stored entries in id order and commits each batch. Only untagged entries are touched
+    unless `retag` is set, which re-applies the current rules to every entry. Returns the count.
+    """
+    matcher = get_matcher()
+    table = LogEntry.__table__
+    stmt = table.update().where(table.c.id == bindparam("entry_id")).values(tags=bindparam("new_tags"))
+    last_id = None
+    total = 0
+    while True:
+        query = select(LogEntry.id, LogEntry.message).order_by(LogEntry.id).limit(BACKFILL_BATCH_ROWS)
+        if not retag:
+            query = query.where(LogEntry.tags.is_(None))
+        if last_id is not None:
+            query = query.where(LogEntry.id > last_id)
+        rows = db.execute(query).all()
+        if not rows:
+            return total
+        db.execute(
+            stmt,
+            [{"entry_id": entry_id, "new_tags": matcher.tags(message)} for entry_id, message in rows],
+        )
+        db.commit()
+        last_id = rows[-1][0]
+        total += len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain ingest-time keyword tags on log_entries")
+    sub = parser.add_subparsers(dest="command", required=True)
+    backfill_cmd = sub.add_parser("backfill", help="Tag entries stored before tagging existed")
+    backfill_cmd.add_argument("--all", action="store_true", help="Re-tag every entry with the current rules")
+    args = parser.parse_args()
+    from app.db.session import SessionLocal
+    db = SessionLocal()
+    try:
+        if args.command == "backfill":
+            print(f"Tagged {backfill(db, retag=args.all)} entries")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
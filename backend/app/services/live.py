@@ -0,0 +1,246 @@
+import asyncio
+import collections
+import json
+import logging
+import os
+import time
+
+import redis
+import redis.asyncio
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+# "redis" carries entries from any process (API workers, Celery) to every API worker's viewers;
+# "memory" only reaches viewers connected to the publishing process (tests, single-process dev)
+LIVE_BUS_BACKEND = os.getenv("LIVE_BUS_BACKEND", "redis").lower()
+LIVE_CHANNEL = "logsentinel:live"
+LIVE_ALERT_CHANNEL = "logsentinel:alerts"
+# Entries are coalesced into one frame per filter group every LIVE_FLUSH_MS, or sooner once
+# LIVE_BATCH_LINES are waiting; at most LIVE_PENDING_MAX entries wait between flushes
+LIVE_FLUSH_MS = int(os.getenv("LIVE_FLUSH_MS", "50"))
+LIVE_BATCH_LINES = int(os.getenv("LIVE_BATCH_LINES", "500"))
+LIVE_PENDING_MAX = int(os.getenv("LIVE_PENDING_MAX", "50000"))
+# Frames buffered per viewer (oldest dropped first) and how long one send may take before eviction
+LIVE_QUEUE_FRAMES = int(os.getenv("LIVE_QUEUE_FRAMES", "64"))
+LIVE_SEND_TIMEOUT = float(os.getenv("LIVE_SEND_TIMEOUT", "5"))
+# How long a publisher trusts its last count of Redis subscribers before asking again
+SUBSCRIBER_CHECK_SECONDS = 1.0
+
+
+class Subscription:
+    """
+    One viewer's filters and bounded queue of serialized frames. Frames are shared between
+    viewers with the same filters; offer() never blocks, and a full queue drops its oldest frame,
+    so a slow viewer only loses its own backlog.
+    """
+    def __init__(self, levels=None, keyword=None, maxsize=LIVE_QUEUE_FRAMES):
+        self.queue = collections.deque(maxlen=maxsize)
+        self.ready = asyncio.Event()
+        self.dropped = 0
+        self.set_filters(levels, keyword)
+
+    def set_filters(self, levels=None, keyword=None):
+        # Exact, like the /logs level filter: entries keep the level's case as logged
+        self.levels = frozenset(lvl.strip() for lvl in levels if lvl.strip()) if levels else None
+        self.keyword = keyword.strip().lower() if keyword and keyword.strip() else None
+
+    @property
+    def filter_key(self):
+        return (self.levels, self.keyword)
+
+    def matches(self, entry):
+        if self.levels is not None and entry["level"] not in self.levels:
+            return False
+        return self.keyword is None or self.keyword in entry["message"].lower()
+
+    def offer(self, frame, lines):
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += self.queue[0][1]
+        self.queue.append((frame, lines))
+        self.ready.set()
+
+    async def next_frame(self):
+        while not self.queue:
+            self.ready.clear()
+            await self.ready.wait()
+        return self.queue.popleft()[0]
+
+
+class LiveHub:
+    """
+    Fans published entries out to the subscriptions of this process. Entries are buffered and
+    flushed in batches: each filter group's frame is serialized once and queued for every viewer
+    in the group, and each viewer's sender task delivers its frames independently. With the redis
+    bus, the process only subscribes to the channels while it has viewers, so publishers can tell
+    from the channel's subscriber count whether anyone is watching.
+    """
+    def __init__(self):
+        self.subscriptions = set()
+        self.pending = collections.deque(maxlen=LIVE_PENDING_MAX)
+        self.has_pending = None
+        self.batch_full = None
+        self.loop = None
+        self.tasks = []
+        self.listener = None
+
+    def subscribe(self, subscription):
+        self.subscriptions.add(subscription)
+        if LIVE_BUS_BACKEND == "redis" and self.listener is None and self.loop is not None:
+            self.listener = asyncio.create_task(self._listen())
+
+    def unsubscribe(self, subscription):
+        self.subscriptions.discard(subscription)
+        if not self.subscriptions and self.listener is not None:
+            self.listener.cancel()
+            self.listener = None
+
+    def dispatch(self, entries):
+        if not self.subscriptions or self.has_pending is None:
+            return
+        self.pending.extend(entries)
+        self.has_pending.set()
+        if len(self.pending) >= LIVE_BATCH_LINES:
+            self.batch_full.set()
+
+    def dispatch_alerts(self, alerts):
+        # Alerts are rare, so they skip the batching and go out at once to viewers of their level
+        for subscription in list(self.subscriptions):
+            matched = [a for a in alerts if subscription.levels is None or a["level"] in subscription.levels]
+            if matched:
+                subscription.offer(json.dumps({"alerts": matched}), 0)
+
+    def flush(self):
+        entries = list(self.pending)
+        self.pending.clear()
+        groups = collections.defaultdict(list)
+        for subscription in self.subscriptions:
+            groups[subscription.filter_key].append(subscription)
+        for members in groups.values():
+            matched = [entry for entry in entries if members[0].matches(entry)]
+            for i in range(0, len(matched), LIVE_BATCH_LINES):
+                lines = matched[i:i + LIVE_BATCH_LINES]
+                frame = json.dumps({"entries": lines})
+                for subscription in members:
+                    subscription.offer(frame, len(lines))
+
+    async def _flush_loop(self):
+        while True:
+            await self.has_pending.wait()
+            try:
+                async with asyncio.timeout(LIVE_FLUSH_MS / 1000):
+                    await self.batch_full.wait()
+            except TimeoutError:
+                pass
+            self.has_pending.clear()
+            self.batch_full.clear()
+            self.flush()
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.has_pending = asyncio.Event()
+        self.batch_full = asyncio.Event()
+        self.tasks.append(asyncio.create_task(self._flush_loop()))
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+        if self.listener is not None:
+            self.listener.cancel()
+            self.listener = None
+
+    async def _listen(self):
+        while True:
+            try:
+                client = redis.asyncio.Redis.from_url(REDIS_URL)
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(LIVE_CHANNEL, LIVE_ALERT_CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] != "message" or not self.subscriptions:
+                            continue
+                        if message["channel"] == LIVE_ALERT_CHANNEL.encode():
+                            self.dispatch_alerts(json.loads(message["data"]))
+                        else:
+                            self.dispatch(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except redis.RedisError as exc:
+                logger.warning("Live bus listener lost Redis, retrying: %s", exc)
+                await asyncio.sleep(1)
+
+
+hub = LiveHub()
+
+_redis = None
+_subscriber_check = [0.0, 0]  # [checked_at, subscriber count]
+
+
+def _has_listeners():
+    global _redis
+    if LIVE_BUS_BACKEND != "redis":
+        return hub.loop is not None and bool(hub.subscriptions)
+    now = time.monotonic()
+    if now - _subscriber_check[0] >= SUBSCRIBER_CHECK_SECONDS:
+        if _redis is None:
+            _redis = redis.Redis.from_url(REDIS_URL, socket_timeout=1)
+        _subscriber_check[:] = [now, dict(_redis.pubsub_numsub(LIVE_CHANNEL)).get(LIVE_CHANNEL.encode(), 0)]
+    return _subscriber_check[1] > 0
+
+
+def publish(rows, log_upload_id=None):
+    """
+    Publishes freshly committed (id, timestamp, level, message, source, tags, template_id) rows to
+    live viewers. Safe to call from any thread or process; it does nothing when no viewer is
+    connected and never raises, since a live tail must not fail an ingest.
+    """
+    try:
+        if not rows or not _has_listeners():
+            return
+        upload_id = str(log_upload_id) if log_upload_id else None
+        entries = [
+            {
+                "id": str(entry_id),
+                "timestamp": timestamp.isoformat(),
+                "level": level,
+                "message": message,
+                "source": source,
+                "tags": tags,
+                "template_id": template_id,
+                "upload_id": upload_id,
+            }
+            for entry_id, timestamp, level, message, source, tags, template_id in rows
+        ]
+        if LIVE_BUS_BACKEND == "redis":
+            _redis.publish(LIVE_CHANNEL, json.dumps(entries))
+        else:
+            hub.loop.call_soon_threadsafe(hub.dispatch, entries)
+    except (redis.RedisError, RuntimeError) as exc:
+        logger.warning("Could not publish %d live entries: %s", len(rows), exc)
+
+
+def publish_alerts(alerts):
+    """Publishes alerts saved by app.services.anomaly to live viewers; like publish(), never raises."""
+    try:
+        if not alerts or not _has_listeners():
+            return
+        payload = [
+            {
+                "id": str(alert["id"]),
+                "minute": alert["minute"].isoformat(),
+                "source": alert["source"],
+                "level": alert["level"],
+                "template_id": alert["template_id"],
+                "count": alert["count"],
+                "expected": alert["expected"],
+                "score": alert["score"],
+                "upload_id": str(alert["log_upload_id"]) if alert["log_upload_id"] else None,
+            }
+            for alert in alerts
+        ]
+        if LIVE_BUS_BACKEND == "redis":
+            _redis.publish(LIVE_ALERT_CHANNEL, json.dumps(payload))
+        else:
+            hub.loop.call_soon_threadsafe(hub.dispatch_alerts, payload)
+    except (redis.RedisError, RuntimeError) as exc:
+        logger.warning("Could not publish %d live alerts: %s", len(alerts), exc)
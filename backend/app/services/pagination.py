@@ -0,0 +1,60 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
+from sqlalchemy import asc, desc, tuple_
+
+from app.models import LogEntry
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(entry, direction):
+    payload = json.dumps([entry.timestamp.isoformat(), str(entry.id), direction], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        timestamp, entry_id, direction = json.loads(base64.urlsafe_b64decode(padded))
+        if direction not in ("next", "prev"):
+            raise ValueError(direction)
+        return datetime.fromisoformat(timestamp), uuid.UUID(entry_id), direction
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor(f"Invalid cursor: {token}") from exc
+
+
+async def paginate(db, stmt, order, limit, cursor=None):
+    """
+    Keyset pagination of a select(LogEntry) statement ordered by (timestamp, id) in `order` ("asc" or "desc").
+    Each page is one index range scan of limit + 1 rows, however deep it is.
+    Returns (entries, next_cursor, prev_cursor); cursors are opaque tokens or None at either end.
+    """
+    key = tuple_(LogEntry.timestamp, LogEntry.id)
+    direction = "next"
+    if cursor:
+        ts, entry_id, direction = decode_cursor(cursor)
+        after = (direction == "next") == (order == "asc")
+        stmt = stmt.where(key > tuple_(ts, entry_id) if after else key < tuple_(ts, entry_id))
+    # Walking backwards reads the opposite order and flips the page afterwards
+    forward = (order == "asc") == (direction == "next")
+    sort = asc if forward else desc
+    stmt = stmt.order_by(sort(LogEntry.timestamp), sort(LogEntry.id)).limit(limit + 1)
+    rows = list((await db.execute(stmt)).scalars())
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == "prev":
+        rows.reverse()
+    if not rows:
+        return rows, None, None
+    if direction == "next":
+        next_cursor = encode_cursor(rows[-1], "next") if has_more else None
+        prev_cursor = encode_cursor(rows[0], "prev") if cursor else None
+    else:
+        next_cursor = encode_cursor(rows[-1], "next")
+        prev_cursor = encode_cursor(rows[0], "prev") if has_more else None
+    return rows, next_cursor, prev_cursor
@@ -0,0 +1,59 @@
+import io
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from app.services.chunking import iter_aligned_chunks
+from app.services.format_detection import FormatDetection, pinned_parsers
+from app.services.ingestion import IngestStats, parse_lines
+from app.utils.line_reader import iter_lines
+
+# Number of parser processes; 1 keeps parsing in the request thread
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "1"))
+PARALLEL_CHUNK_BYTES = int(os.getenv("PARALLEL_CHUNK_BYTES", str(4 * 1024 * 1024)))
+
+_executors = {}
+
+
+def _get_executor(workers):
+    # One long-lived pool per worker count; spawn keeps the server's threads and DB connections out of it
+    if workers not in _executors:
+        _executors[workers] = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+    return _executors[workers]
+
+
+def _parse_chunk(data, detection, resume):
+    """Worker: parses one aligned chunk and returns (timestamp, level, message) tuples plus its stats."""
+    stats = IngestStats()
+    parsers = pinned_parsers(FormatDetection(*detection), resume=resume)
+    rows = [
+        (norm['timestamp'], norm['level'], norm['message'])
+        for norm in parse_lines(iter_lines(io.BytesIO(data)), "", stats, parsers)
+    ]
+    return rows, stats.to_dict()
+
+
+def parse_parallel(fileobj, filename, stats, detection, workers=PARSE_WORKERS, resume=False):
+    """
+    Parses a binary file object across a process pool and yields (timestamp, level, message, source)
+    rows in file order. Chunks are cut only where no multiline record spans the cut and stats are
+    merged in order, so the output matches serial parse_lines(). At most 2 * workers chunks are in flight.
+    With resume=True the first chunk also starts from the detection's parser state, for a file's tail.
+    """
+    executor = _get_executor(workers)
+    pending = deque()
+    detection = tuple(detection)
+
+    def drain_one():
+        rows, part = pending.popleft().result()
+        stats.merge(part)
+        for timestamp, level, message in rows:
+            yield timestamp, level, message, filename
+
+    for index, data in enumerate(iter_aligned_chunks(fileobj, PARALLEL_CHUNK_BYTES, FormatDetection(*detection))):
+        pending.append(executor.submit(_parse_chunk, data, detection, resume or index > 0))
+        if len(pending) >= 2 * workers:
+            yield from drain_one()
+    while pending:
+        yield from drain_one()
@@ -0,0 +1,72 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from sqlalchemy import and_, or_, true
+
+from app.models import LogEntry
+from app.services.search import InvalidSearchQuery, message_matches, parse_query
+from app.utils.timestamps import to_utc_naive
+
+
+class InvalidQuery(ValueError):
+    pass
+
+
+class LogQuery(NamedTuple):
+    """Normalized, hashable filter parameters shared by /logs, /logs/export and /logs/report."""
+    level: Optional[str] = None
+    search: Optional[str] = None
+    from_date: Optional[datetime] = None
+    to_date: Optional[datetime] = None
+    logic: str = "AND"
+
+
+@lru_cache(maxsize=1024)
+def _parse_date(name, value):
+    try:
+        return to_utc_naive(datetime.fromisoformat(value))
+    except ValueError:
+        raise InvalidQuery(f"Invalid {name}: {value!r} (expected YYYY-MM-DD or ISO 8601)")
+
+
+def log_query(level=None, search=None, from_date=None, to_date=None, logic="AND"):
+    """
+    Builds a LogQuery from raw request parameters. Blank values are dropped and dates become naive
+    UTC; the level is kept as given, since stored levels keep the case they were logged in.
+    Raises InvalidQuery for bad dates or search syntax.
+    """
+    level = level.strip() if level and level.strip() else None
+    search = search.strip() if search and search.strip() else None
+    if search:
+        try:
+            parse_query(search)
+        except InvalidSearchQuery as exc:
+            raise InvalidQuery(str(exc))
+    return LogQuery(
+        level=level,
+        search=search,
+        from_date=_parse_date("from_date", from_date.strip()) if from_date and from_date.strip() else None,
+        to_date=_parse_date("to_date", to_date.strip()) if to_date and to_date.strip() else None,
+        logic=logic.upper(),
+    )
+
+
+@lru_cache(maxsize=256)
+def criteria(spec, dialect_name):
+    """
+    The WHERE clause for a LogQuery. Every value is a bound parameter, so equal filter shapes share
+    one entry in SQLAlchemy's compiled-statement cache; the expression itself is memoized per spec.
+    """
+    filters = []
+    if spec.level:
+        filters.append(LogEntry.level == spec.level)
+    if spec.search:
+        filters.append(message_matches(spec.search, dialect_name))
+    if spec.from_date:
+        filters.append(LogEntry.timestamp >= spec.from_date)
+    if spec.to_date:
+        filters.append(LogEntry.timestamp <= spec.to_date)
+    if not filters:
+        return true()
+    return and_(*filters) if spec.logic == "AND" else or_(*filters)
@@ -0,0 +1,175 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import redis
+import redis.asyncio
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+# "redis" shares cached responses between API processes; "memory" keeps them in-process (tests, dev)
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "redis").lower()
+
+# Seconds each endpoint's response may be served from cache; an upload invalidates them sooner
+CACHE_TTLS = {
+    "summary": int(os.getenv("CACHE_TTL_SUMMARY_SECONDS", "15")),
+    "uploads": int(os.getenv("CACHE_TTL_UPLOADS_SECONDS", "5")),
+    "report": int(os.getenv("CACHE_TTL_REPORT_SECONDS", "60")),
+}
+
+KEY_PREFIX = "logsentinel:cache:"
+VERSION_KEY = KEY_PREFIX + "version"
+# A request that misses waits this long for another request already computing the same key
+LOCK_TIMEOUT_SECONDS = 10
+LOCK_WAIT_SECONDS = 5
+LOCK_POLL_SECONDS = 0.05
+
+
+class MemoryBackend:
+    """
+    Dict-backed stand-in for Redis with the handful of commands the cache uses. Reads and fills
+    are awaited from request handlers; incr() is synchronous so ingest code can bump the version.
+    """
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def _live(self, key):
+        item = self.data.get(key)
+        if item is not None and item[0] is not None and item[0] <= time.monotonic():
+            del self.data[key]
+            return None
+        return item
+
+    async def get(self, key):
+        with self.lock:
+            item = self._live(key)
+            return item[1] if item else None
+
+    async def set(self, key, value, ttl):
+        with self.lock:
+            self.data[key] = (time.monotonic() + ttl, value)
+
+    async def add(self, key, value, ttl):
+        with self.lock:
+            if self._live(key):
+                return False
+            self.data[key] = (time.monotonic() + ttl, value)
+            return True
+
+    async def delete(self, key):
+        with self.lock:
+            self.data.pop(key, None)
+
+    def incr(self, key):
+        with self.lock:
+            item = self._live(key)
+            value = int(item[1]) + 1 if item else 1
+            self.data[key] = (None, str(value))
+            return value
+
+
+class RedisBackend:
+    def __init__(self, url):
+        self.client = redis.asyncio.Redis.from_url(url, decode_responses=True, socket_timeout=1)
+        self.sync_client = redis.Redis.from_url(url, decode_responses=True, socket_timeout=1)
+
+    async def get(self, key):
+        return await self.client.get(key)
+
+    async def set(self, key, value, ttl):
+        await self.client.set(key, value, ex=ttl)
+
+    async def add(self, key, value, ttl):
+        return bool(await self.client.set(key, value, ex=ttl, nx=True))
+
+    async def delete(self, key):
+        await self.client.delete(key)
+
+    def incr(self, key):
+        return self.sync_client.incr(key)
+
+
+backend = MemoryBackend() if RESPONSE_CACHE_BACKEND == "memory" else RedisBackend(REDIS_URL)
+
+
+async def cache_version():
+    """The current cache version, for in-process caches that must follow the same invalidation."""
+    try:
+        return await backend.get(VERSION_KEY) or "0"
+    except redis.RedisError:
+        return None
+
+
+def bump_version():
+    """Invalidates every cached response; called whenever uploads or their entries change."""
+    try:
+        backend.incr(VERSION_KEY)
+    except redis.RedisError as exc:
+        logger.warning("Could not bump response cache version: %s", exc)
+
+
+def _serialize(value):
+    # Same encoding as FastAPI's JSONResponse, so cached and uncached bodies are byte-identical
+    body = json.dumps(jsonable_encoder(value), ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    etag = '"' + hashlib.sha1(body.encode("utf-8")).hexdigest() + '"'
+    return etag + "\n" + body
+
+
+async def _get_or_fill(key, ttl, compute):
+    value = await backend.get(key)
+    if value is not None:
+        return value
+    # Single flight: one request computes, concurrent misses wait for its result
+    lock_key = key + ":lock"
+    locked = await backend.add(lock_key, "1", LOCK_TIMEOUT_SECONDS)
+    deadline = time.monotonic() + LOCK_WAIT_SECONDS
+    while not locked and time.monotonic() < deadline:
+        await asyncio.sleep(LOCK_POLL_SECONDS)
+        value = await backend.get(key)
+        if value is not None:
+            return value
+        locked = await backend.add(lock_key, "1", LOCK_TIMEOUT_SECONDS)
+    try:
+        value = _serialize(await compute())
+        await backend.set(key, value, ttl)
+        return value
+    finally:
+        if locked:
+            await backend.delete(lock_key)
+
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+
+
+async def cached_json(request, endpoint, key_parts, compute):
+    """
+    Serves the JSON-serializable result of awaiting compute() through the response cache, keyed
+    on the endpoint, the global cache version and `key_parts` (any value with a stable repr).
+    Responses carry an ETag; a matching If-None-Match gets 304 without a body. If the backend is
+    unreachable the response is computed directly.
+    """
+    try:
+        version = await backend.get(VERSION_KEY) or "0"
+        digest = hashlib.sha1(repr(key_parts).encode("utf-8")).hexdigest()
+        cached = await _get_or_fill(f"{KEY_PREFIX}{endpoint}:{version}:{digest}", CACHE_TTLS[endpoint], compute)
+    except redis.RedisError as exc:
+        logger.warning("Response cache unavailable, computing %s directly: %s", endpoint, exc)
+        cached = _serialize(await compute())
+    etag, body = cached.split("\n", 1)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
@@ -0,0 +1,52 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Seconds a cached query result stays valid (0 disables caching) and how many results are kept
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "30"))
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "256"))
+
+
+class ResultCache:
+    """
+    Small in-process LRU of query results with a time-to-live, for repeated dashboard queries.
+    invalidate() drops everything; uploads call it once their entries are committed. Callers also
+    put the shared response-cache version in their keys, so commits made by Celery workers in
+    other processes are picked up too.
+    """
+    def __init__(self, ttl=RESULT_CACHE_TTL_SECONDS, maxsize=RESULT_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    async def get_or_compute(self, key, compute):
+        """Returns the cached value for `key`, or awaits compute() and caches its result."""
+        if self.ttl <= 0:
+            return await compute()
+        now = time.monotonic()
+        with self.lock:
+            hit = self.entries.get(key)
+            if hit is not None and hit[0] > now:
+                self.entries.move_to_end(key)
+                return hit[1]
+            generation = self.generation
+        value = await compute()
+        with self.lock:
+            if generation != self.generation:
+                return value  # invalidated while computing; the result may predate the new data
+            self.entries[key] = (now + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return value
+
+    def invalidate(self):
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+
+
+result_cache = ResultCache()
@@ -0,0 +1,149 @@
+import argparse
+import uuid
+from collections import Counter, OrderedDict
+from datetime import timedelta
+
+import pytz
+from sqlalchemy import delete, func, select, text
+
+from app.models import LogCountHourly, LogEntry
+
+BUCKET_MINUTES = 15
+NIL_UPLOAD_ID = uuid.UUID(int=0)
+REBUILD_BATCH_ROWS = 50000
+
+
+def bucket_start(ts):
+    return ts.replace(minute=ts.minute - ts.minute % BUCKET_MINUTES, second=0, microsecond=0)
+
+
+def _upsert_statement(dialect_name):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    stmt = insert(LogCountHourly.__table__)
+    return stmt.on_conflict_do_update(
+        index_elements=["bucket_start", "level", "log_upload_id"],
+        set_={"count": LogCountHourly.__table__.c.count + stmt.excluded["count"]},
+    )
+
+
+def add_counts(db, counts):
+    """
+    Adds a Counter of (bucket_start, level, log_upload_id) -> n to the rollup inside the caller's
+    transaction. Keys are written in sorted order so concurrent ingest workers cannot deadlock.
+    """
+    if not counts:
+        return
+    rows = [
+        {"bucket_start": b, "level": level, "log_upload_id": upload_id or NIL_UPLOAD_ID, "count": n}
+        for (b, level, upload_id), n in sorted(counts.items(), key=lambda kv: (kv[0][0], kv[0][1], str(kv[0][2])))
+    ]
+    stmt = _upsert_statement(db.get_bind().dialect.name)
+    if stmt is not None:
+        db.execute(stmt, rows)
+        return
+    table = LogCountHourly.__table__
+    for row in rows:
+        key = (
+            (table.c.bucket_start == row["bucket_start"])
+            & (table.c.level == row["level"])
+            & (table.c.log_upload_id == row["log_upload_id"])
+        )
+        updated = db.execute(table.update().where(key).values(count=table.c.count + row["count"]))
+        if updated.rowcount == 0:
+            db.execute(table.insert().values(**row))
+
+
+def rebuild(db, log_upload_id=None):
+    """Recomputes the rollup from log_entries, for all uploads or a single one, and commits."""
+    table = LogCountHourly.__table__
+    clear = delete(table)
+    if log_upload_id is not None:
+        clear = clear.where(table.c.log_upload_id == log_upload_id)
+    db.execute(clear)
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(
+            text(
+                "INSERT INTO log_counts_hourly (bucket_start, level, log_upload_id, count) "
+                "SELECT date_bin(make_interval(mins => :minutes), timestamp, TIMESTAMP '2000-01-01'), "
+                "level, coalesce(log_upload_id, CAST(:nil AS uuid)), count(*) "
+                "FROM log_entries WHERE (CAST(:upload AS uuid) IS NULL OR log_upload_id = CAST(:upload AS uuid)) "
+                "GROUP BY 1, 2, 3"
+            ),
+            {
+                "minutes": BUCKET_MINUTES,
+                "nil": str(NIL_UPLOAD_ID),
+                "upload": str(log_upload_id) if log_upload_id is not None else None,
+            },
+        )
+    else:
+        # Stream the entries and aggregate in memory; state grows with buckets, not rows
+        query = select(LogEntry.timestamp, LogEntry.level, LogEntry.log_upload_id)
+        if log_upload_id is not None:
+            query = query.where(LogEntry.log_upload_id == log_upload_id)
+        counts = Counter()
+        for ts, level, upload_id in db.execute(query.execution_options(yield_per=REBUILD_BATCH_ROWS)):
+            counts[(bucket_start(ts), level, upload_id)] += 1
+        add_counts(db, counts)
+    db.commit()
+
+
+def histogram(db, start, end, tz, interval="hour", level=None, log_upload_id=None):
+    """
+    Entry counts per local hour or day between two aware datetimes, read from the rollup.
+    Only bucket boundaries are converted to `tz`; empty intervals are filled with 0.
+    """
+    step = timedelta(hours=1) if interval == "hour" else timedelta(days=1)
+    fmt = '%Y-%m-%d %H:00' if interval == "hour" else '%Y-%m-%d'
+
+    def floor_local(dt):
+        dt = dt.astimezone(tz).replace(minute=0, second=0, microsecond=0)
+        if interval == "day":
+            dt = dt.replace(hour=0)
+        return dt
+
+    query = (
+        select(LogCountHourly.bucket_start, func.sum(LogCountHourly.count))
+        .where(LogCountHourly.bucket_start >= start.astimezone(pytz.UTC).replace(tzinfo=None))
+        .where(LogCountHourly.bucket_start < end.astimezone(pytz.UTC).replace(tzinfo=None))
+        .group_by(LogCountHourly.bucket_start)
+    )
+    if level:
+        query = query.where(LogCountHourly.level == level)
+    if log_upload_id is not None:
+        query = query.where(LogCountHourly.log_upload_id == log_upload_id)
+    counts = {}
+    for bucket, n in db.execute(query):
+        key = floor_local(pytz.UTC.localize(bucket)).strftime(fmt)
+        counts[key] = counts.get(key, 0) + int(n)
+    filled = OrderedDict()
+    current = floor_local(start)
+    while current < end:
+        key = current.strftime(fmt)
+        filled[key] = counts.get(key, 0)
+        current = tz.normalize(current + step)
+        current = floor_local(current)
+    return filled
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the log_counts_hourly rollup table")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild_cmd = sub.add_parser("rebuild", help="Recompute the rollup from log_entries")
+    rebuild_cmd.add_argument("--upload-id", help="Only rebuild counts for this upload")
+    args = parser.parse_args()
+    from app.db.session import SessionLocal
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            rebuild(db, uuid.UUID(args.upload_id) if args.upload_id else None)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
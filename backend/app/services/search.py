@@ -0,0 +1,176 @@
+import re
+
+from sqlalchemy import and_, func, literal_column, not_, or_
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+from app.models import LogEntry
+
+# Text search configuration used for both the stored vectors and the queries. 'simple' only
+# lowercases, so identifiers, hostnames and error codes are matched as written, without stemming.
+TS_CONFIG = "simple"
+
+# Generated column maintained by PostgreSQL (see the add_log_entry_search_vector migration).
+# It is not mapped on LogEntry so ORM loads never fetch the vectors.
+MESSAGE_TSV = literal_column("log_entries.message_tsv", TSVECTOR)
+
+_TOKEN = re.compile(r'\s*(?:(?P<phrase>"[^"]*"?)|(?P<paren>[()])|(?P<word>[^\s()"]+))')
+
+
+class InvalidSearchQuery(ValueError):
+    pass
+
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        pos = m.end()
+        if m.group("phrase") is not None:
+            words = m.group("phrase").strip('"').split()
+            if words:
+                tokens.append(("phrase", words))
+        elif m.group("paren"):
+            tokens.append((m.group("paren"), None))
+        else:
+            word = m.group("word")
+            if word in ("AND", "OR", "NOT"):
+                tokens.append((word, None))
+            elif word.startswith("-") and len(word) > 1:
+                tokens.append(("NOT", None))
+                tokens.append(_term(word[1:]))
+            else:
+                tokens.append(_term(word))
+    return tokens
+
+
+def _term(word):
+    if word.endswith("*") and len(word) > 1:
+        return ("prefix", word.rstrip("*"))
+    return ("term", word)
+
+
+class _Parser:
+    """
+    Recursive descent over the token list. Grammar, loosest binding first:
+      or   := and ("OR" and)*
+      and  := not (["AND"] not)*      adjacent terms are ANDed
+      not  := "NOT" not | atom        "-word" is shorthand for NOT word
+      atom := "(" or ")" | "phrase" | word | prefix*
+    """
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.parse_or()
+        if self.pos != len(self.tokens):
+            raise InvalidSearchQuery(f"Unexpected '{self.peek()}' in search query")
+        return node
+
+    def parse_or(self):
+        nodes = [self.parse_and()]
+        while self.peek() == "OR":
+            self.take()
+            nodes.append(self.parse_and())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def parse_and(self):
+        nodes = [self.parse_not()]
+        while self.peek() not in (None, "OR", ")"):
+            if self.peek() == "AND":
+                self.take()
+            nodes.append(self.parse_not())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def parse_not(self):
+        if self.peek() == "NOT":
+            self.take()
+            return ("not", self.parse_not())
+        return self.parse_atom()
+
+    def parse_atom(self):
+        kind = self.peek()
+        if kind is None:
+            raise InvalidSearchQuery("Search query ends unexpectedly")
+        if kind == "(":
+            self.take()
+            node = self.parse_or()
+            if self.peek() != ")":
+                raise InvalidSearchQuery("Unbalanced parentheses in search query")
+            self.take()
+            return node
+        if kind in ("term", "prefix", "phrase"):
+            return self.take()
+        raise InvalidSearchQuery(f"Unexpected '{kind}' in search query")
+
+
+def parse_query(text):
+    """
+    Parses a search string into a tree of ("term", word), ("prefix", word), ("phrase", [words]),
+    ("not", node), ("and", [nodes]) and ("or", [nodes]).
+    Supports "quoted phrases", prefix*, AND / OR / NOT (upper case), -word and parentheses.
+    """
+    tokens = _tokenize(text)
+    if not tokens:
+        raise InvalidSearchQuery("Search query is empty")
+    return _Parser(tokens).parse()
+
+
+def _quote(text):
+    # Quoted tsquery lexemes are run through the text search parser, so punctuation stays literal
+    return "'" + text.replace("\\", "\\\\").replace("'", "''") + "'"
+
+
+def to_tsquery_text(node):
+    """Renders a parsed query in to_tsquery() syntax; phrases use <-> through the quoted form."""
+    kind = node[0]
+    if kind == "term":
+        return _quote(node[1])
+    if kind == "prefix":
+        return _quote(node[1]) + ":*"
+    if kind == "phrase":
+        return _quote(" ".join(node[1]))
+    if kind == "not":
+        return "!" + to_tsquery_text(node[1])
+    joiner = " & " if kind == "and" else " | "
+    return "(" + joiner.join(to_tsquery_text(child) for child in node[1]) + ")"
+
+
+def _like_escape(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _like_clause(node):
+    kind = node[0]
+    if kind in ("term", "prefix"):
+        return LogEntry.message.ilike(f"%{_like_escape(node[1])}%", escape="\\")
+    if kind == "phrase":
+        return LogEntry.message.ilike(f"%{_like_escape(' '.join(node[1]))}%", escape="\\")
+    if kind == "not":
+        return not_(_like_clause(node[1]))
+    combine = and_ if kind == "and" else or_
+    return combine(*(_like_clause(child) for child in node[1]))
+
+
+def message_matches(text, dialect_name):
+    """
+    Filter for the `search` query parameter. On PostgreSQL the query is matched against the
+    GIN-indexed message_tsv column; other backends get the same boolean tree of ILIKE clauses.
+    The two differ in granularity: PostgreSQL matches whole words (word prefixes for "word*"),
+    while ILIKE matches substrings, so "time" also finds "timeout" there. Raises
+    InvalidSearchQuery for malformed queries.
+    """
+    node = parse_query(text)
+    if dialect_name == "postgresql":
+        return MESSAGE_TSV.op("@@")(func.to_tsquery(TS_CONFIG, to_tsquery_text(node)))
+    return _like_clause(node)
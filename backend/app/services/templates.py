@@ -0,0 +1,260 @@
+import argparse
+import hashlib
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from functools import lru_cache
+
+from sqlalchemy import bindparam, func, select
+
+from app.models import LogEntry, LogTemplate, LogTemplateCount
+from app.services.rollup import NIL_UPLOAD_ID
+
+# Drain parameters: messages with the same token count and the same first TEMPLATE_TREE_DEPTH
+# tokens share a leaf, and join the most similar template there if at least
+# TEMPLATE_SIM_THRESHOLD of its constant tokens match
+TEMPLATE_TREE_DEPTH = int(os.getenv("TEMPLATE_TREE_DEPTH", "2"))
+TEMPLATE_SIM_THRESHOLD = float(os.getenv("TEMPLATE_SIM_THRESHOLD", "0.4"))
+# Children per tree node before new tokens are routed to the wildcard child, and templates kept
+# in memory (least recently matched evicted first); together they bound the tree's size
+TEMPLATE_MAX_CHILDREN = int(os.getenv("TEMPLATE_MAX_CHILDREN", "100"))
+TEMPLATE_MAX_CLUSTERS = int(os.getenv("TEMPLATE_MAX_CLUSTERS", "20000"))
+TOP_TEMPLATES = 10
+BACKFILL_BATCH_ROWS = 5000
+
+WILDCARD = "<*>"
+# Variables masked before clustering: UUIDs, IPv4 addresses (with port), hex literals and ids,
+# and numbers with an optional short unit (250ms, 12.5%, 3KB)
+_MASK = re.compile(
+    r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"
+    r"|\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b"
+    r"|\b0[xX][0-9a-fA-F]+\b"
+    r"|\b(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{8,}\b"
+    r"|(?<![\w.])[-+]?\d+(?:\.\d+)*(?:[a-zA-Z]{1,3}|%)?(?!\w)"
+)
+_DIGIT = re.compile(r"\d")
+
+
+def mask(message):
+    return _MASK.sub(WILDCARD, message)
+
+
+def template_id(template):
+    """Stable id of a template text; 53 bits so it survives JSON clients that use doubles."""
+    digest = hashlib.blake2b(template.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") & ((1 << 53) - 1)
+
+
+class Cluster:
+    __slots__ = ("id", "tokens", "leaf")
+
+    def __init__(self, tokens, leaf):
+        self.tokens = tokens
+        self.leaf = leaf
+        # The id is fixed at creation; the template text may generalize afterwards
+        self.id = template_id(" ".join(tokens))
+
+    @property
+    def template(self):
+        return " ".join(self.tokens)
+
+
+class TemplateMiner:
+    """
+    Incremental Drain-style template miner. Masked messages descend a fixed-depth tree keyed by
+    token count and then by their first tokens (tokens with digits go to the wildcard child);
+    each leaf holds a few templates, and a message joins the most similar one, turning the
+    positions that differ into wildcards, or starts a new template. Memory is bounded by
+    TEMPLATE_MAX_CHILDREN per node and an LRU of TEMPLATE_MAX_CLUSTERS templates. Thread-safe.
+    """
+    def __init__(
+        self,
+        depth=TEMPLATE_TREE_DEPTH,
+        sim_threshold=TEMPLATE_SIM_THRESHOLD,
+        max_children=TEMPLATE_MAX_CHILDREN,
+        max_clusters=TEMPLATE_MAX_CLUSTERS,
+    ):
+        self.depth = depth
+        self.sim_threshold = sim_threshold
+        self.max_children = max_children
+        self.max_clusters = max_clusters
+        self.root = {}
+        self.clusters = OrderedDict()
+        self.lock = threading.Lock()
+
+    def add(self, message):
+        """The Cluster `message` belongs to, creating or generalizing a template as needed."""
+        tokens = mask(message).split()
+        with self.lock:
+            leaf = self._leaf(tokens)
+            cluster = self._best_match(leaf, tokens)
+            if cluster is None:
+                cluster = Cluster(tokens, leaf)
+                leaf.append(cluster)
+                self.clusters[id(cluster)] = cluster
+                if len(self.clusters) > self.max_clusters:
+                    _, evicted = self.clusters.popitem(last=False)
+                    evicted.leaf.remove(evicted)
+            else:
+                self.clusters.move_to_end(id(cluster))
+                if cluster.tokens != tokens:
+                    cluster.tokens = [t if t == m else WILDCARD for t, m in zip(cluster.tokens, tokens)]
+            return cluster
+
+    def _leaf(self, tokens):
+        node = self.root.get(len(tokens))
+        if node is None:
+            node = self.root[len(tokens)] = {}
+        for token in tokens[:self.depth]:
+            if token not in node:
+                if _DIGIT.search(token) or len(node) >= self.max_children:
+                    token = WILDCARD
+            child = node.get(token)
+            if child is None:
+                child = node[token] = {}
+            node = child
+        # Leaves are the list stored under the None key of the last node
+        leaf = node.get(None)
+        if leaf is None:
+            leaf = node[None] = []
+        return leaf
+
+    def _best_match(self, leaf, tokens):
+        best, best_sim, best_wildcards = None, -1.0, -1
+        for cluster in leaf:
+            same = wildcards = 0
+            for t, m in zip(cluster.tokens, tokens):
+                # Masked variables match each other; wildcards from generalization match nothing
+                if t == m:
+                    same += 1
+                elif t == WILDCARD:
+                    wildcards += 1
+            sim = same / len(tokens) if tokens else 1.0
+            if sim > best_sim or (sim == best_sim and wildcards > best_wildcards):
+                best, best_sim, best_wildcards = cluster, sim, wildcards
+        return best if best is not None and best_sim >= self.sim_threshold else None
+
+
+@lru_cache(maxsize=1)
+def get_miner():
+    """The process-wide miner, so templates carry over between uploads handled by one worker."""
+    return TemplateMiner()
+
+
+def _upsert(dialect_name, table, index_elements, set_):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    stmt = insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={name: value(stmt.excluded) for name, value in set_.items()},
+    )
+
+
+def add_counts(db, counts, clusters):
+    """
+    Adds a Counter of (log_upload_id, template_id) -> n to log_template_counts and records the
+    current text of `clusters` ({template_id: Cluster}) in log_templates, inside the caller's
+    transaction. Keys are written in sorted order so concurrent ingest workers cannot deadlock.
+    """
+    if not counts:
+        return
+    dialect_name = db.get_bind().dialect.name
+    if clusters:
+        db.execute(
+            _upsert(dialect_name, LogTemplate.__table__, ["id"], {"template": lambda excluded: excluded["template"]}),
+            [{"id": tid, "template": clusters[tid].template} for tid in sorted(clusters)],
+        )
+    table = LogTemplateCount.__table__
+    db.execute(
+        _upsert(
+            dialect_name, table, ["log_upload_id", "template_id"],
+            {"count": lambda excluded: table.c.count + excluded["count"]},
+        ),
+        [
+            {"log_upload_id": upload_id or NIL_UPLOAD_ID, "template_id": tid, "count": n}
+            for (upload_id, tid), n in sorted(counts.items(), key=lambda kv: (str(kv[0][0]), kv[0][1]))
+        ],
+    )
+
+
+def top_templates(db, where=None, limit=TOP_TEMPLATES):
+    """
+    The `limit` most frequent templates as [{"template", "count"}]. Without a filter this reads
+    the per-upload counts table; with one it groups the matching entries by template_id.
+    Templates that ended up with the same text are reported once.
+    """
+    if where is None:
+        total = func.sum(LogTemplateCount.count)
+        query = (
+            select(LogTemplate.template, total)
+            .join(LogTemplate, LogTemplate.id == LogTemplateCount.template_id)
+        )
+    else:
+        total = func.count()
+        query = (
+            select(LogTemplate.template, total)
+            .select_from(LogEntry)
+            .join(LogTemplate, LogTemplate.id == LogEntry.template_id)
+            .where(where)
+        )
+    rows = db.execute(query.group_by(LogTemplate.template).order_by(total.desc()).limit(limit)).all()
+    return [{"template": template, "count": int(n)} for template, n in rows]
+
+
+def backfill(db):
+    """
+    Assigns templates to entries stored before template mining, in id order, committing each
+    batch with its template counts. Returns the number of entries updated.
+    """
+    miner = get_miner()
+    table = LogEntry.__table__
+    stmt = table.update().where(table.c.id == bindparam("entry_id")).values(template_id=bindparam("tid"))
+    last_id = None
+    total = 0
+    while True:
+        query = (
+            select(LogEntry.id, LogEntry.message, LogEntry.log_upload_id)
+            .where(LogEntry.template_id.is_(None))
+            .order_by(LogEntry.id)
+            .limit(BACKFILL_BATCH_ROWS)
+        )
+        if last_id is not None:
+            query = query.where(LogEntry.id > last_id)
+        rows = db.execute(query).all()
+        if not rows:
+            return total
+        counts = Counter()
+        clusters = {}
+        params = []
+        for entry_id, message, upload_id in rows:
+            cluster = miner.add(message)
+            clusters[cluster.id] = cluster
+            counts[(upload_id, cluster.id)] += 1
+            params.append({"entry_id": entry_id, "tid": cluster.id})
+        db.execute(stmt, params)
+        add_counts(db, counts, clusters)
+        db.commit()
+        last_id = rows[-1][0]
+        total += len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain message templates on log_entries")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("backfill", help="Assign templates to entries stored before template mining existed")
+    args = parser.parse_args()
+    from app.db.session import SessionLocal
+    db = SessionLocal()
+    try:
+        if args.command == "backfill":
+            print(f"Assigned templates to {backfill(db)} entries")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import os
+import shutil
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "/tmp/logsentinel-uploads")
+
+
+def upload_path(upload_id):
+    return os.path.join(UPLOAD_DIR, f"{upload_id}.log")
+
+
+def store_upload(fileobj, upload_id):
+    """Copies an uploaded file to shared storage in chunks so a worker can parse it later."""
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    path = upload_path(upload_id)
+    with open(path, 'wb') as out:
+        shutil.copyfileobj(fileobj, out, 1024 * 1024)
+    return path
+
+
+def remove_upload(upload_id):
+    try:
+        os.remove(upload_path(upload_id))
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,22 @@
+import os
+
+from celery import Celery
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+# Eager mode runs tasks inline with an in-memory broker, so tests need no Redis
+CELERY_TASK_ALWAYS_EAGER = os.getenv("CELERY_TASK_ALWAYS_EAGER", "false").lower() in ("1", "true", "yes")
+
+if CELERY_TASK_ALWAYS_EAGER:
+    celery_app = Celery("logsentinel", broker="memory://", backend="cache+memory://", include=["app.tasks.ingest"])
+else:
+    celery_app = Celery("logsentinel", broker=REDIS_URL, backend=REDIS_URL, include=["app.tasks.ingest"])
+
+celery_app.conf.update(
+    task_always_eager=CELERY_TASK_ALWAYS_EAGER,
+    task_eager_propagates=True,
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+)
@@ -0,0 +1,181 @@
+import os
+import uuid
+from itertools import islice
+
+from celery import chord
+from sqlalchemy import func, insert, select, update
+
+from app.db.bulk import delete_upload_data
+from app.db.session import SessionLocal
+from app.models import LogUpload, LogUploadChunk
+from app.services import dedup
+from app.services.chunking import RangeReader, find_split_offsets
+from app.services.format_detection import (
+    DETECTION_SAMPLE_LINES,
+    FormatDetection,
+    detect_format,
+    pinned_parsers,
+)
+from app.services.ingestion import IngestStats, ingest_lines
+from app.services.response_cache import bump_version
+from app.services.upload_store import remove_upload, upload_path
+from app.tasks.celery_app import celery_app
+from app.utils.line_reader import iter_lines
+
+# Target size of the byte ranges parsed by each parse_chunk task
+CHUNK_BYTES = int(os.getenv("INGEST_CHUNK_BYTES", str(16 * 1024 * 1024)))
+
+
+def _mark_failed(db, upload_id, exc):
+    # The status is committed before the cleanup, so a sibling chunk that commits rows after the
+    # cleanup has started sees "failed" when it finishes and removes its own (see parse_chunk)
+    db.rollback()
+    db.execute(
+        update(LogUpload)
+        .where(LogUpload.id == uuid.UUID(upload_id))
+        .values(status="failed", error=str(exc))
+    )
+    db.commit()
+    delete_upload_data(db, uuid.UUID(upload_id))
+    db.commit()
+    bump_version()
+
+
+def _sum_chunks(column, upload_id):
+    return (
+        select(func.coalesce(func.sum(column), 0))
+        .where(LogUploadChunk.log_upload_id == upload_id)
+        .scalar_subquery()
+    )
+
+
+def _refresh_progress(db, upload_id):
+    # Summed from log_upload_chunks rather than incremented, so a redelivered range is counted once.
+    # Chunks committing at the same moment may miss each other's row; the next one or
+    # finalize_upload corrects it.
+    db.execute(
+        update(LogUpload)
+        .where(LogUpload.id == upload_id)
+        .values(
+            bytes_processed=_sum_chunks(LogUploadChunk.bytes_processed, upload_id),
+            lines_parsed=_sum_chunks(LogUploadChunk.lines_parsed, upload_id),
+            lines_failed=_sum_chunks(LogUploadChunk.lines_failed, upload_id),
+        )
+    )
+
+
+def _upload_failed(db, upload_id):
+    return db.execute(select(LogUpload.status).where(LogUpload.id == upload_id)).scalar() == "failed"
+
+
+@celery_app.task(name="ingest_upload")
+def ingest_upload(upload_id):
+    """
+    Splits a stored upload into line-aligned byte ranges that never cut a multiline record,
+    and parses them in parallel with a chord that finalizes the upload's stats. Returns the chord's
+    id; the AsyncResult itself is not JSON serializable for the result backend.
+    """
+    db = SessionLocal()
+    try:
+        path = upload_path(upload_id)
+        upload = db.get(LogUpload, uuid.UUID(upload_id))
+        # The tail of an extended upload is parsed with its base's format and parser state
+        base = db.get(LogUpload, upload.base_upload_id) if upload.base_upload_id else None
+        detection = dedup.base_detection(base) if base is not None else None
+        resume = detection is not None
+        if detection is None:
+            with open(path, 'rb') as f:
+                detection = detect_format(list(islice(iter_lines(f), DETECTION_SAMPLE_LINES)))
+        ranges = find_split_offsets(path, CHUNK_BYTES, detection)
+        db.execute(
+            update(LogUpload)
+            .where(LogUpload.id == uuid.UUID(upload_id))
+            .values(status="processing", bytes_total=os.path.getsize(path), bytes_processed=0)
+        )
+        db.commit()
+        bump_version()
+    except Exception as exc:
+        _mark_failed(db, upload_id, exc)
+        raise
+    finally:
+        db.close()
+    header = [parse_chunk.s(upload_id, start, end, list(detection), resume or start > 0) for start, end in ranges]
+    return chord(header)(finalize_upload.s(upload_id, list(detection))).id
+
+
+@celery_app.task(name="parse_chunk")
+def parse_chunk(upload_id, start, end, detection, resume=None):
+    """
+    Parses bytes [start, end) of a stored upload and bulk-inserts the entries. With `resume` the
+    parsers start from the detection's parser state; by default any chunk but the first does.
+    Entries and alerts are tagged with the range's start and the range's progress is recorded in
+    log_upload_chunks, so a redelivered task (acks are late) first removes everything an earlier
+    attempt wrote for the range and the chunk is counted once. Once another chunk has failed the
+    upload, a chunk writes nothing, or removes what it wrote.
+    """
+    db = SessionLocal()
+    try:
+        upload = db.get(LogUpload, uuid.UUID(upload_id))
+        if upload.status == "failed":
+            return IngestStats().to_dict()
+        delete_upload_data(db, upload.id, chunk_offset=start)
+        _refresh_progress(db, upload.id)
+        db.commit()
+        stats = IngestStats()
+        parsers = pinned_parsers(FormatDetection(*detection), resume=start > 0 if resume is None else resume)
+        with open(upload_path(upload_id), 'rb') as f:
+            lines = iter_lines(RangeReader(f, start, end))
+            ingest_lines(db, upload.id, lines, upload.filename, stats, parsers, chunk_offset=start)
+        db.execute(insert(LogUploadChunk.__table__).values(
+            log_upload_id=upload.id,
+            chunk_offset=start,
+            bytes_processed=end - start,
+            lines_parsed=stats.lines_parsed,
+            lines_failed=stats.lines_failed,
+        ))
+        _refresh_progress(db, upload.id)
+        db.commit()
+        if _upload_failed(db, upload.id):
+            delete_upload_data(db, upload.id, chunk_offset=start)
+            db.commit()
+        return stats.to_dict()
+    except Exception as exc:
+        _mark_failed(db, upload_id, exc)
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(name="finalize_upload")
+def finalize_upload(results, upload_id, detection):
+    """Merges per-chunk stats in file order and marks the upload completed."""
+    stats = IngestStats()
+    for part in results:
+        stats.merge(part)
+    detection = FormatDetection(*detection)
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(LogUpload)
+            .where(LogUpload.id == uuid.UUID(upload_id))
+            .values(
+                status="completed",
+                bytes_processed=_sum_chunks(LogUploadChunk.bytes_processed, uuid.UUID(upload_id)),
+                lines_parsed=stats.lines_parsed,
+                lines_failed=stats.lines_failed,
+                stats={
+                    "lines_read": stats.lines_read,
+                    "formats_detected": stats.format_counts,
+                    "detected_format": detection.format,
+                    "format_confidence": round(detection.confidence, 3),
+                    "parser_state": detection.parser_state,
+                    "lines_failed_examples": stats.failed_examples,
+                },
+            )
+        )
+        db.commit()
+        bump_version()
+    finally:
+        db.close()
+    remove_upload(upload_id)
+    return stats.to_dict()
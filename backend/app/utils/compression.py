@@ -0,0 +1,62 @@
+import bz2
+import gzip
+import lzma
+import re
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # .zst uploads are optional and need the zstandard package
+    zstandard = None
+
+# app.log, app.log.1 (rotated) and either of them compressed, e.g. app.log.1.gz
+LOG_FILENAME = re.compile(r"\.log(?:\.\d+)?(?:\.(gz|bz2|xz|zst))?$", re.IGNORECASE)
+
+# Corrupt or truncated input: gzip raises zlib.error on bad deflate data and BadGzipFile (an
+# OSError) on a bad header, bz2 raises OSError, xz LZMAError, zstandard ZstdError, and all of
+# them EOFError on a truncated stream
+DECOMPRESSION_ERRORS = (OSError, EOFError, zlib.error, lzma.LZMAError) + ((zstandard.ZstdError,) if zstandard else ())
+
+
+class UnsupportedCompression(ValueError):
+    pass
+
+
+def compression_for(filename):
+    """
+    The compression suffix of an accepted log filename ("gz", "bz2", "xz", "zst"), or None for
+    plain text. Raises UnsupportedCompression for other names, and for .zst without zstandard.
+    """
+    match = LOG_FILENAME.search(filename or "")
+    if match is None:
+        raise UnsupportedCompression("Only .log files are accepted, optionally compressed as .gz, .bz2, .xz or .zst")
+    compression = match.group(1) and match.group(1).lower()
+    if compression == "zst" and zstandard is None:
+        raise UnsupportedCompression(".zst uploads need the zstandard package on the server")
+    return compression
+
+
+def open_decompressed(fileobj, compression):
+    """
+    Binary file object over the decompressed content of `fileobj`, read from its current position.
+    Decompression is incremental, so memory stays bounded by the reader's chunk size; concatenated
+    gzip/bzip2/xz members are read as one stream, like the command-line tools do.
+    """
+    if compression is None:
+        return fileobj
+    if compression == "gz":
+        return gzip.GzipFile(fileobj=fileobj, mode="rb")
+    if compression == "bz2":
+        return bz2.BZ2File(fileobj, mode="rb")
+    if compression == "xz":
+        return lzma.LZMAFile(fileobj, mode="rb")
+    return zstandard.ZstdDecompressor().stream_reader(fileobj, read_across_frames=True)
+
+
+def skip_bytes(stream, n, chunk_size=1024 * 1024):
+    """Reads and discards the first `n` bytes of a forward-only stream."""
+    while n > 0:
+        chunk = stream.read(min(n, chunk_size))
+        if not chunk:
+            break
+        n -= len(chunk)
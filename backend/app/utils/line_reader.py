@@ -0,0 +1,36 @@
+import codecs
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+def _has_line_break(part):
+    # splitlines() keeps the terminator when keepends=True, so a piece without
+    # one is an unfinished line that continues in the next chunk.
+    return part.splitlines()[0] != part if part else False
+
+
+def iter_lines(fileobj, chunk_size=DEFAULT_CHUNK_SIZE, encoding='utf-8'):
+    """
+    Yields decoded lines from a binary file object, reading it in fixed-size chunks.
+    Line splitting matches str.splitlines(), including lines (and multi-byte
+    characters) that straddle a chunk boundary, so memory stays bounded by the chunk size.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ''
+    while True:
+        chunk = fileobj.read(chunk_size)
+        final = not chunk
+        text = pending + decoder.decode(chunk, final=final)
+        pending = ''
+        # A short read may end inside a multi-byte character and decode to nothing yet; only an
+        # empty read ends the stream
+        parts = text.splitlines(keepends=True)
+        if parts and not final:
+            last = parts[-1]
+            # A trailing '\r' may be the first half of a '\r\n' pair split across chunks
+            if not _has_line_break(last) or last.endswith('\r'):
+                pending = parts.pop()
+        for part in parts:
+            yield part.splitlines()[0] if _has_line_break(part) else part
+        if final:
+            break
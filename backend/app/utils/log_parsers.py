@@ -1,14 +1,42 @@
 import re
 import json
 import csv
+import string
 from datetime import datetime
 
+from app.utils.timestamps import parse_apache_timestamp, parse_syslog_timestamp, parse_timestamp
+
+def _is_indented(line):
+    return line.startswith((' ', '\t')) and bool(line.strip())
+
+class Block(list):
+    """The lines of one multiline record being collected, with scratch state its parser keeps meanwhile."""
+    def __init__(self, lines=()):
+        super().__init__(lines)
+        self.state = {}
+
 class BaseLogParser:
     name = "base"
     multiline = False
+    # Characters a matching line (or a block's first line) can start with; None means any
+    first_chars = None
     def match(self, line):
         raise NotImplementedError
 
+    # Multiline parsers: does this line open a block, and does `line` extend the Block collected so far?
+    def starts_block(self, line):
+        return True
+
+    def continues_block(self, block, line):
+        return False
+
+    # Per-file state (e.g. a CSV header) that a parser needs to resume parsing mid-file
+    def state(self):
+        return None
+
+    def restore(self, state):
+        pass
+
     def normalize(self, match_dict, filename):
         # Always return {timestamp, level, message, source}
         d = dict(match_dict)
@@ -22,9 +50,11 @@ class ApacheLogParser(BaseLogParser):
     def match(self, line):
         m = self.regex.match(line)
         if m:
-            dt = datetime.strptime(m.group('timestamp'), "%d/%b/%Y:%H:%M:%S %z")
+            dt = parse_apache_timestamp(m.group('timestamp'))
+            if dt is None:
+                return None
             return {
-                'timestamp': dt.isoformat(),
+                'timestamp': dt,
                 'level': 'INFO',
                 'message': f"{m.group('request')} (status {m.group('status')}, size {m.group('size')})"
             }
@@ -33,12 +63,16 @@ class ApacheLogParser(BaseLogParser):
 # 2. JSON Logs
 class JSONLogParser(BaseLogParser):
     name = "json"
+    first_chars = '{ \t'
     def match(self, line):
         try:
             obj = json.loads(line)
             if all(k in obj for k in ("timestamp", "level", "message")):
+                dt = parse_timestamp(obj['timestamp'])
+                if dt is None:
+                    return None
                 return {
-                    'timestamp': obj['timestamp'],
+                    'timestamp': dt,
                     'level': obj['level'],
                     'message': obj['message']
                 }
@@ -49,14 +83,19 @@ class JSONLogParser(BaseLogParser):
 # 3. Syslog Logs (Linux)
 class SyslogParser(BaseLogParser):
     name = "syslog"
+    first_chars = string.ascii_uppercase
+    def __init__(self):
+        # Syslog omits the year; resolve it once per file rather than per line
+        self.year = datetime.now().year
     regex = re.compile(r'^(?P<timestamp>[A-Z][a-z]{2} +\d{1,2} \d{2}:\d{2}:\d{2}) (?P<host>\S+) (?P<process>[\w\-\[\].]+): (?P<message>.*)')
     def match(self, line):
         m = self.regex.match(line)
         if m:
-            # Guess year as current year
-            dt = datetime.strptime(f"{datetime.now().year} {m.group('timestamp')}", "%Y %b %d %H:%M:%S")
+            dt = parse_syslog_timestamp(m.group('timestamp'), self.year)
+            if dt is None:
+                return None
             return {
-                'timestamp': dt.isoformat(),
+                'timestamp': dt,
                 'level': 'INFO',
                 'message': m.group('message')
             }
@@ -66,12 +105,21 @@ class SyslogParser(BaseLogParser):
 class JavaStacktraceParser(BaseLogParser):
     name = "java_stacktrace"
     multiline = True
+    first_chars = 'jE'
+    continuation_prefixes = ('at ', 'Caused by:', 'Suppressed:', '...')
+    def starts_block(self, line):
+        return line.startswith('java.') or line.startswith('Exception')
+
+    def continues_block(self, block, line):
+        # Frames are indented ("\tat ...") and chained causes follow; a blank line ends the trace
+        return _is_indented(line) or line.startswith(self.continuation_prefixes)
+
     def match(self, lines):
         if not lines[0].startswith('java.') and not lines[0].startswith('Exception'):
             return None
         msg = '\n'.join(lines)
         return {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': datetime.utcnow(),
             'level': 'ERROR',
             'message': msg
         }
@@ -79,12 +127,16 @@ class JavaStacktraceParser(BaseLogParser):
 # 5. Custom Application Logs
 class CustomAppLogParser(BaseLogParser):
     name = "custom_app"
+    first_chars = '['
     regex = re.compile(r'^\[(?P<timestamp>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] \[(?P<level>\w+)\] \[(?P<module>[^\]]+)\] - (?P<message>.*)')
     def match(self, line):
         m = self.regex.match(line)
         if m:
+            dt = parse_timestamp(m.group('timestamp'))
+            if dt is None:
+                return None
             return {
-                'timestamp': m.group('timestamp'),
+                'timestamp': dt,
                 'level': m.group('level'),
                 'message': f"[{m.group('module')}] {m.group('message')}"
             }
@@ -95,14 +147,21 @@ class CSVLogParser(BaseLogParser):
     name = "csv"
     def __init__(self):
         self.header = None
+    def state(self):
+        return self.header
+    def restore(self, state):
+        self.header = state
     def match(self, line):
         # Only match if header is present
         if self.header is not None:
             reader = csv.DictReader([line], fieldnames=self.header)
             row = next(reader)
             if 'timestamp' in row and 'level' in row and 'message' in row:
+                dt = parse_timestamp(row['timestamp'])
+                if dt is None:
+                    return None
                 return {
-                    'timestamp': row['timestamp'],
+                    'timestamp': dt,
                     'level': row['level'],
                     'message': row['message']
                 }
@@ -114,6 +173,22 @@ class CSVLogParser(BaseLogParser):
 class WindowsEventLogParser(BaseLogParser):
     name = "windows_event"
     multiline = True
+    first_chars = 'D'
+    field_regex = re.compile(r'^[A-Z][A-Za-z ]*:')
+    def starts_block(self, line):
+        return line.startswith('Date:')
+
+    def continues_block(self, block, line):
+        # Fields run until a blank line or the next event; a Description may wrap onto free-text lines
+        if not line.strip() or line.startswith('Date:'):
+            return False
+        if line.startswith('Description:'):
+            block.state['description'] = True
+            return True
+        if self.field_regex.match(line) or _is_indented(line):
+            return True
+        return block.state.get('description', False)
+
     def match(self, lines):
         if not lines[0].startswith('Date:'):
             return None
@@ -129,9 +204,10 @@ class WindowsEventLogParser(BaseLogParser):
                 desc.append(line.split('Description:')[1].strip())
             else:
                 desc.append(line.strip())
-        if date and source and eventid:
+        dt = parse_timestamp(date) if date else None
+        if dt and source and eventid:
             return {
-                'timestamp': date,
+                'timestamp': dt,
                 'level': 'INFO',
                 'message': f"{source} (Event ID: {eventid}) - {' '.join(desc)}"
             }
@@ -140,12 +216,16 @@ class WindowsEventLogParser(BaseLogParser):
 # 8. Kubernetes/Docker Logs
 class K8sDockerLogParser(BaseLogParser):
     name = "k8s_docker"
+    first_chars = string.digits
     regex = re.compile(r'^(?P<timestamp>\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?Z) (?P<stream>\w+) (?P<flag>\w) (?P<message>.*)')
     def match(self, line):
         m = self.regex.match(line)
         if m:
+            dt = parse_timestamp(m.group('timestamp'))
+            if dt is None:
+                return None
             return {
-                'timestamp': m.group('timestamp'),
+                'timestamp': dt,
                 'level': m.group('stream').upper(),
                 'message': m.group('message')
             }
@@ -155,12 +235,29 @@ class K8sDockerLogParser(BaseLogParser):
 class PythonTracebackParser(BaseLogParser):
     name = "python_traceback"
     multiline = True
+    first_chars = '['
+    exception_regex = re.compile(r'^[A-Za-z_][\w.]*(?::|$)')
+    def starts_block(self, line):
+        return line.startswith('[') and 'ERROR' in line
+
+    def continues_block(self, block, line):
+        if _is_indented(line) or line.startswith('Traceback'):
+            return True
+        if line.startswith(('During handling of the above exception', 'The above exception was')):
+            return True
+        # The unindented "ValueError: ..." line closes a traceback after its frames
+        return (
+            len(block) > 1
+            and _is_indented(block[-1])
+            and bool(self.exception_regex.match(line))
+        )
+
     def match(self, lines):
         if not (lines[0].startswith('[') and 'ERROR' in lines[0]):
             return None
         msg = '\n'.join(lines)
         ts = re.findall(r'\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\]', lines[0])
-        timestamp = ts[0] if ts else datetime.now().isoformat()
+        timestamp = (parse_timestamp(ts[0]) if ts else None) or datetime.utcnow()
         return {
             'timestamp': timestamp,
             'level': 'ERROR',
@@ -170,12 +267,16 @@ class PythonTracebackParser(BaseLogParser):
 # 10. Delimited Logs (|, tab)
 class DelimitedLogParser(BaseLogParser):
     name = "delimited"
+    first_chars = string.digits
     regex = re.compile(r'^(?P<timestamp>\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2})[|\t](?P<level>\w+)[|\t](?P<message>.+)')
     def match(self, line):
         m = self.regex.match(line)
         if m:
+            dt = parse_timestamp(m.group('timestamp'))
+            if dt is None:
+                return None
             return {
-                'timestamp': m.group('timestamp'),
+                'timestamp': dt,
                 'level': m.group('level'),
                 'message': m.group('message')
             }
@@ -184,12 +285,16 @@ class DelimitedLogParser(BaseLogParser):
 # 0. Simple YYYY-MM-DD HH:MM:SS LEVEL Message
 class SimpleLogParser(BaseLogParser):
     name = "simple"
+    first_chars = string.digits
     regex = re.compile(r'^(?P<timestamp>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) (?P<level>\w+) (?P<message>.+)$')
     def match(self, line):
         m = self.regex.match(line)
         if m:
+            dt = parse_timestamp(m.group('timestamp'))
+            if dt is None:
+                return None
             return {
-                'timestamp': m.group('timestamp'),
+                'timestamp': dt,
                 'level': m.group('level'),
                 'message': m.group('message'),
             }
@@ -209,3 +314,23 @@ ALL_PARSERS = [
     PythonTracebackParser(),
     DelimitedLogParser(),
 ]
+
+
+class ParserDispatcher:
+    """
+    Classifies a line by its first character and returns only the parsers that can match it,
+    in the order they were given, so each line skips the regexes that could never apply.
+    """
+    def __init__(self, parsers):
+        self.parsers = list(parsers)
+        self.any_start = [p for p in self.parsers if p.first_chars is None]
+        chars = set()
+        for p in self.parsers:
+            chars.update(p.first_chars or '')
+        self.table = {
+            c: [p for p in self.parsers if p.first_chars is None or c in p.first_chars]
+            for c in chars
+        }
+
+    def candidates(self, line):
+        return self.table.get(line[:1], self.any_start)
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+# Access logs repeat the same second thousands of times, so every parser memoizes on the raw string
+CACHE_SIZE = 4096
+
+MONTHS = {
+    'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+    'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12,
+}
+
+# Formats tried after datetime.fromisoformat() for free-form timestamps (e.g. Windows event exports)
+FALLBACK_FORMATS = (
+    "%d/%b/%Y:%H:%M:%S %z",
+    "%m/%d/%Y %I:%M:%S %p",
+    "%m/%d/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S",
+    "%Y/%m/%d %H:%M:%S",
+)
+
+
+def to_utc_naive(dt):
+    """Timestamps are stored as naive UTC; aware values are converted, naive ones are taken as UTC."""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_apache_timestamp(value):
+    """Parses '10/Oct/2023:13:55:36 -0700' without strptime; returns None if malformed."""
+    try:
+        dt = datetime(
+            int(value[7:11]), MONTHS[value[3:6]], int(value[0:2]),
+            int(value[12:14]), int(value[15:17]), int(value[18:20]),
+        )
+        sign = -1 if value[21] == '-' else 1
+        offset = sign * timedelta(hours=int(value[22:24]), minutes=int(value[24:26]))
+    except (KeyError, ValueError, IndexError):
+        return None
+    return dt - offset
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_syslog_timestamp(value, year):
+    """Parses 'Oct 11 22:14:15' (day may be space-padded) in the given year; returns None if malformed."""
+    try:
+        month, day, clock = value.split()
+        hour, minute, second = clock.split(':')
+        return datetime(year, MONTHS[month], int(day), int(hour), int(minute), int(second))
+    except (KeyError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_text(value):
+    try:
+        return to_utc_naive(datetime.fromisoformat(value))
+    except ValueError:
+        pass
+    for fmt in FALLBACK_FORMATS:
+        try:
+            return to_utc_naive(datetime.strptime(value, fmt))
+        except ValueError:
+            continue
+    return None
+
+
+def parse_timestamp(value):
+    """
+    Normalizes a timestamp from any parser (ISO 8601 string, epoch seconds or datetime)
+    to a naive UTC datetime. Returns None when the value cannot be interpreted.
+    """
+    if isinstance(value, datetime):
+        return to_utc_naive(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        try:
+            return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+        except (OverflowError, OSError, ValueError):
+            return None
+    if isinstance(value, str):
+        return _parse_text(value.strip())
+    return None
@@ -0,0 +1,60 @@
+"""
+Read and parse throughput of compressed uploads (gzip, bzip2, xz and, if installed, zstd)
+against plain text, through the same streaming open_decompressed -> iter_lines -> parse_lines
+path upload_log uses.
+
+    cd backend && python -m benchmarks.compressed_ingest [--lines 200000] [--repeat 3]
+"""
+import argparse
+import bz2
+import gzip
+import io
+import lzma
+import time
+
+from app.services.ingestion import IngestStats, parse_lines
+from app.utils.compression import open_decompressed, zstandard
+from app.utils.line_reader import iter_lines
+from benchmarks.samples import simple_lines
+
+
+def _best(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    raw = ("\n".join(simple_lines(args.lines)) + "\n").encode()
+    inputs = [(None, raw), ("gz", gzip.compress(raw, 6)), ("bz2", bz2.compress(raw)), ("xz", lzma.compress(raw))]
+    if zstandard is not None:
+        inputs.append(("zst", zstandard.ZstdCompressor().compress(raw)))
+    print(f"{args.lines} lines, {len(raw) / 1e6:.1f} MB uncompressed")
+    for compression, data in inputs:
+        read_time, lines = _best(
+            lambda: sum(1 for _ in iter_lines(open_decompressed(io.BytesIO(data), compression))), args.repeat
+        )
+        parse_time, entries = _best(
+            lambda: sum(1 for _ in parse_lines(
+                iter_lines(open_decompressed(io.BytesIO(data), compression)), "bench.log", IngestStats()
+            )),
+            args.repeat,
+        )
+        if lines != args.lines or entries != args.lines:
+            raise SystemExit(f"{compression or 'plain'}: read {lines} lines and {entries} entries")
+        print(
+            f"{compression or 'plain':5s} {len(raw) / len(data):5.1f}x smaller  "
+            f"read {len(raw) / read_time / 1e6:6.0f} MB/s  parse {entries / parse_time / 1e3:5.0f}k lines/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
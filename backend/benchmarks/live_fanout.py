@@ -0,0 +1,104 @@
+"""
+Live-tail fan-out throughput: entries published to the hub and delivered to 1k and 10k simulated
+WebSocket clients (split across level filters), against the old approach of one send_text of one
+serialized line per client, in order. Includes one dead client, which must be evicted.
+
+    cd backend && python -m benchmarks.live_fanout [--clients 1000,10000] [--lines 20000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+os.environ.setdefault("LIVE_BUS_BACKEND", "memory")
+
+from app.main import _send_frames  # noqa: E402
+from app.services import live  # noqa: E402
+
+LEVELS = ["ERROR", "INFO", "WARNING", "DEBUG"]
+
+
+class FakeSocket:
+    def __init__(self):
+        self.frames = 0
+
+    async def send_text(self, text):
+        self.frames += 1
+
+    async def close(self, code=1000):
+        pass
+
+
+class DeadSocket(FakeSocket):
+    async def send_text(self, text):
+        raise RuntimeError("connection closed")
+
+
+def _entries(n):
+    return [
+        {"id": str(i), "timestamp": "2024-01-01T00:00:00", "level": LEVELS[i % 4], "message": f"message {i}",
+         "source": None, "tags": [], "template_id": None, "upload_id": None}
+        for i in range(n)
+    ]
+
+
+async def batched(clients, entries):
+    hub = live.hub
+    await hub.start()
+    sockets, tasks = [], []
+    for i in range(clients):
+        socket, subscription = FakeSocket(), live.Subscription([LEVELS[i % 4]])
+        hub.subscribe(subscription)
+        sockets.append(socket)
+        tasks.append(asyncio.create_task(_send_frames(socket, subscription)))
+    dead = live.Subscription()
+    hub.subscribe(dead)
+    tasks.append(asyncio.create_task(_send_frames(DeadSocket(), dead)))
+    start = time.perf_counter()
+    for i in range(0, len(entries), 1000):
+        hub.dispatch(entries[i:i + 1000])
+        await asyncio.sleep(0)
+    while hub.pending or any(s.queue for s in hub.subscriptions):
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    evicted = dead not in hub.subscriptions
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    hub.subscriptions.clear()
+    await hub.stop()
+    return elapsed, sum(s.frames for s in sockets), evicted
+
+
+async def per_line(clients, entries):
+    sockets = [FakeSocket() for _ in range(clients)]
+    start = time.perf_counter()
+    for entry in entries:
+        for i, socket in enumerate(sockets):
+            if entry["level"] == LEVELS[i % 4]:
+                await socket.send_text(json.dumps(entry))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", default="1000,10000")
+    parser.add_argument("--lines", type=int, default=20000)
+    args = parser.parse_args()
+    entries = _entries(args.lines)
+    for clients in (int(c) for c in args.clients.split(",")):
+        # Each client receives the quarter of the entries at its level
+        deliveries = clients * args.lines // 4
+        elapsed, frames, evicted = asyncio.run(batched(clients, entries))
+        # The per-line baseline is timed on about 500k deliveries and scaled, to keep runs short
+        sample = min(args.lines, max(4, 2_000_000 // clients))
+        baseline = asyncio.run(per_line(clients, entries[:sample])) * args.lines / sample
+        print(
+            f"{clients} clients: batched {deliveries / elapsed:12,.0f} msgs/s ({frames:,} frames), "
+            f"per-line {deliveries / baseline:12,.0f} msgs/s, dead client evicted: {evicted}"
+        )
+
+
+if __name__ == "__main__":
+    main()
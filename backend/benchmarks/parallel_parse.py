@@ -0,0 +1,86 @@
+"""
+Parse throughput of parse_parallel() over 1..N worker processes against serial parse_lines(),
+for mixed, Apache, CSV and Windows event files (the last without blank lines, so it has no safe
+cut). Every run must reproduce the serial entries, timestamps included, and stats.
+
+    cd backend && python -m benchmarks.parallel_parse [--workers 1,2,4,8] [--mb 40]
+"""
+import argparse
+import io
+import os
+import time
+from datetime import datetime
+from itertools import islice
+
+from app.services import parallel_parse
+from app.services.format_detection import detect_format, pinned_parsers
+from app.services.ingestion import IngestStats, parse_lines
+from app.utils.line_reader import iter_lines
+from benchmarks.samples import mixed_lines
+
+
+def _files(megabytes):
+    target = megabytes * 1024 * 1024
+    mixed = ("\n".join(mixed_lines(200000)) + "\n").encode()
+    apache = "".join(
+        f'127.0.0.1 - - [10/Oct/2023:13:{i // 60 % 60:02d}:{i % 60:02d} -0700] "GET /item/{i} HTTP/1.0" 200 {i}\n'
+        for i in range(200000)
+    ).encode()
+    csv = ("timestamp,level,message\n" + "".join(
+        f"2024-01-01T00:{i // 60 % 60:02d}:{i % 60:02d},INFO,message {i}\n" for i in range(400000)
+    )).encode()
+    windows = "".join(
+        f"Date: 2024-01-01 10:{i // 60 % 60:02d}:{i % 60:02d}\nSource: Service Control Manager\n"
+        f"Event ID: {7000 + i % 100}\nDescription: The service {i} entered the running state.\n"
+        for i in range(100000)
+    ).encode()
+    return {
+        # Repeating mixed/apache content keeps every copy parseable; CSV keeps its single header
+        "mixed": mixed * max(1, target // len(mixed)),
+        "apache": apache * max(1, target // len(apache)),
+        "csv": csv,
+        "windows": windows * max(1, target // len(windows)),
+    }
+
+
+def _rows(pairs, started):
+    # Records without a timestamp are stamped with the time they were parsed; the samples' own
+    # timestamps are all older than the run, so those two cases cannot be confused
+    return [
+        ("parse time" if timestamp >= started else timestamp, level, message)
+        for timestamp, level, message, *_ in pairs
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    default_workers = sorted({1, 2, 4, os.cpu_count() or 1})
+    parser.add_argument("--workers", default=",".join(map(str, default_workers)),
+                        help="comma-separated worker counts (default: %(default)s)")
+    parser.add_argument("--mb", type=int, default=40, help="approximate size of the mixed, Apache and Windows files")
+    args = parser.parse_args()
+    worker_counts = [int(w) for w in args.workers.split(",")]
+    started = datetime.utcnow()
+    print(f"{os.cpu_count()} CPUs, {parallel_parse.PARALLEL_CHUNK_BYTES // 1024} KiB chunks")
+    for name, data in _files(args.mb).items():
+        detection = detect_format(list(islice(iter_lines(io.BytesIO(data)), 200)))
+        serial_stats = IngestStats()
+        start = time.perf_counter()
+        entries = parse_lines(iter_lines(io.BytesIO(data)), "bench.log", serial_stats, pinned_parsers(detection))
+        serial = _rows(((n["timestamp"], n["level"], n["message"]) for n in entries), started)
+        serial_time = time.perf_counter() - start
+        print(f"{name}: {len(data) / 1e6:.0f} MB, {len(serial)} entries, serial {len(data) / serial_time / 1e6:.1f} MB/s")
+        for workers in worker_counts:
+            # Warm the pool so process start-up is not timed
+            list(parallel_parse.parse_parallel(io.BytesIO(data[:4096]), "bench.log", IngestStats(), detection, workers))
+            stats = IngestStats()
+            start = time.perf_counter()
+            rows = _rows(parallel_parse.parse_parallel(io.BytesIO(data), "bench.log", stats, detection, workers), started)
+            elapsed = time.perf_counter() - start
+            if rows != serial or stats.to_dict() != serial_stats.to_dict():
+                raise SystemExit(f"{name}: {workers} workers did not reproduce the serial parse")
+            print(f"  {workers:2d} workers: {len(data) / elapsed / 1e6:6.1f} MB/s ({serial_time / elapsed:.2f}x serial)")
+
+
+if __name__ == "__main__":
+    main()
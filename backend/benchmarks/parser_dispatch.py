@@ -0,0 +1,57 @@
+"""
+Per-line parse cost with the first-character ParserDispatcher versus trying every parser in turn,
+on a mixed-format file. Both runs must produce identical entries and stats.
+
+    cd backend && python -m benchmarks.parser_dispatch [--lines 60000] [--repeat 3]
+"""
+import argparse
+import time
+from unittest import mock
+
+from app.services import ingestion
+from app.services.format_detection import fresh_parsers
+from benchmarks.samples import mixed_lines
+
+
+class TryEveryParser:
+    """The pre-dispatch behaviour: every parser is a candidate for every line."""
+    def __init__(self, parsers):
+        self.parsers = list(parsers)
+
+    def candidates(self, line):
+        return self.parsers
+
+
+def run(lines, dispatcher_class, repeat):
+    best = None
+    with mock.patch.object(ingestion, "ParserDispatcher", dispatcher_class):
+        for _ in range(repeat):
+            stats = ingestion.IngestStats()
+            start = time.perf_counter()
+            # Timestamps are left out: records without one are stamped with the current time
+            entries = [
+                (e["level"], e["message"])
+                for e in ingestion.parse_lines(lines, "bench.log", stats, fresh_parsers())
+            ]
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    return best, entries, stats.to_dict()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=60000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    lines = mixed_lines(args.lines)
+    baseline, base_entries, base_stats = run(lines, TryEveryParser, args.repeat)
+    dispatched, entries, stats = run(lines, ingestion.ParserDispatcher, args.repeat)
+    if entries != base_entries or stats != base_stats:
+        raise SystemExit("dispatcher output differs from trying every parser")
+    print(f"{len(lines)} mixed-format lines, {len(entries)} entries")
+    print(f"every parser: {baseline / len(lines) * 1e6:6.2f} us/line")
+    print(f"dispatcher:   {dispatched / len(lines) * 1e6:6.2f} us/line ({baseline / dispatched:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
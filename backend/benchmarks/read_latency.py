@@ -0,0 +1,165 @@
+"""
+p50/p99 latency of the read endpoints under many concurrent keep-alive clients, against a running
+server. Compare two builds by pointing it at each in turn.
+
+    cd backend && python -m benchmarks.read_latency --url http://localhost:8000 [--clients 500] [--seconds 30]
+
+With --compare it instead starts its own server on DATABASE_URL serving the same two reads (the
+latest page of /logs and /uploads) twice: as sync handlers on the sync engine, which take a
+threadpool worker per request, and as async handlers on the async engine, and measures both.
+
+    cd backend && python -m benchmarks.read_latency --compare [--clients 500] [--seconds 30]
+"""
+import argparse
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+PATHS = ("/logs?limit=100", "/uploads", "/logs/summary")
+COMPARE_PATHS = ("/sync/logs", "/async/logs", "/sync/uploads", "/async/uploads")
+
+
+def compare_app():
+    """uvicorn factory for --compare: each read as a sync and as an async handler."""
+    from fastapi import Depends, FastAPI
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+
+    from app.db.session import get_async_db, get_db
+    from app.models import LogEntry, LogUpload
+
+    app = FastAPI()
+    latest_logs = select(LogEntry).order_by(LogEntry.timestamp.desc(), LogEntry.id.desc()).limit(100)
+    uploads = select(LogUpload).order_by(LogUpload.uploaded_at.desc())
+
+    def entry(e):
+        return {"id": str(e.id), "timestamp": e.timestamp.isoformat(), "level": e.level, "message": e.message}
+
+    def upload(u):
+        return {"id": str(u.id), "filename": u.filename, "status": u.status, "lines_parsed": u.lines_parsed}
+
+    @app.get("/sync/logs")
+    def sync_logs(db: Session = Depends(get_db)):
+        return [entry(e) for e in db.execute(latest_logs).scalars()]
+
+    @app.get("/async/logs")
+    async def async_logs(db: AsyncSession = Depends(get_async_db)):
+        return [entry(e) for e in (await db.execute(latest_logs)).scalars()]
+
+    @app.get("/sync/uploads")
+    def sync_uploads(db: Session = Depends(get_db)):
+        return [upload(u) for u in db.execute(uploads).scalars()]
+
+    @app.get("/async/uploads")
+    async def async_uploads(db: AsyncSession = Depends(get_async_db)):
+        return [upload(u) for u in (await db.execute(uploads)).scalars()]
+
+    return app
+
+
+async def _read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = {k.strip().lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:] if line)}
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    return status
+
+
+async def _client(host, port, path, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n".encode()
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            status = await _read_response(reader)
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(status)
+    except (OSError, asyncio.IncompleteReadError) as exc:
+        errors.append(type(exc).__name__)
+    finally:
+        writer.close()
+
+
+def _percentile(values, q):
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def run(url, clients, seconds, paths=PATHS):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    results = {}
+    for path in paths:
+        latencies, errors = [], []
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(*(_client(host, port, path, deadline, latencies, errors) for _ in range(clients)))
+        latencies.sort()
+        results[path] = (latencies, errors)
+        if latencies:
+            print(
+                f"{path:18s} {len(latencies) / seconds:8.0f} req/s  p50 {_percentile(latencies, 0.5) * 1000:7.1f} ms  "
+                f"p99 {_percentile(latencies, 0.99) * 1000:7.1f} ms  errors {len(errors)}"
+            )
+        else:
+            print(f"{path:18s} no successful requests, errors {errors[:5]}")
+    return results
+
+
+def _serve_compare_app():
+    # A separate process, so the load generator does not share the server's event loop or GIL
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "--factory", "benchmarks.read_latency:compare_app",
+        "--port", str(port), "--log-level", "warning",
+    ])
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server, f"http://127.0.0.1:{port}"
+        except OSError:
+            if server.poll() is not None or time.monotonic() > deadline:
+                server.kill()
+                raise SystemExit("the comparison server did not start")
+            time.sleep(0.2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--compare", action="store_true",
+                        help="start a server with sync and async versions of each read and measure both")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=30)
+    args = parser.parse_args()
+    if not args.compare:
+        print(f"{args.clients} concurrent clients, {args.seconds:g}s per endpoint against {args.url}")
+        asyncio.run(run(args.url, args.clients, args.seconds))
+        return
+    server, url = _serve_compare_app()
+    try:
+        print(f"{args.clients} concurrent clients, {args.seconds:g}s per endpoint, sync vs async handlers")
+        asyncio.run(run(url, args.clients, args.seconds, COMPARE_PATHS))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
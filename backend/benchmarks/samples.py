@@ -0,0 +1,46 @@
+"""Synthetic log lines shared by the benchmarks."""
+import random
+
+# One record of each format the parsers know, plus continuation lines and an unparseable one
+MIXED_LINES = [
+    '2024-01-01 10:00:00 INFO started service',
+    '127.0.0.1 - - [10/Oct/2023:13:55:36 -0700] "GET /index.html HTTP/1.0" 200 2326',
+    '{"timestamp": "2024-01-01T10:00:00", "level": "WARN", "message": "json msg"}',
+    'Oct 11 22:14:15 myhost sshd[123]: Failed password for root',
+    'java.lang.NullPointerException: boom',
+    '\tat com.foo.Bar.baz(Bar.java:10)',
+    '\tat com.foo.Bar.qux(Bar.java:20)',
+    'Caused by: java.io.IOException: x',
+    '[2024-01-01 10:00:01] [ERROR] [db] - connection timeout',
+    '2024-01-01T10:00:02,INFO,csv line',
+    'Date: 2024-01-01 10:00:03',
+    'Source: Service Control Manager',
+    'Event ID: 7036',
+    'Description: The service entered the running state.',
+    '2024-01-01T10:00:04.123Z stdout F container says hi',
+    '[2024-01-01 10:00:05] ERROR in app: unhandled',
+    'Traceback (most recent call last):',
+    '  File "x.py", line 1, in <module>',
+    'ValueError: bad',
+    '2024-01-01 10:00:06|ERROR|delimited failure',
+    'garbage line ☃ ünïcode',
+]
+
+
+def mixed_lines(n, seed=0):
+    """`n` lines drawn as short runs of MIXED_LINES, so multiline records stay mostly together."""
+    rng = random.Random(seed)
+    out = []
+    while len(out) < n:
+        k = rng.randrange(len(MIXED_LINES))
+        out.extend(MIXED_LINES[k:k + rng.randrange(1, 5)])
+    return out[:n]
+
+
+def simple_lines(n):
+    """`n` single-format lines with varying timestamps, levels and numbers."""
+    return [
+        f'2024-01-01 10:{i // 60 % 60:02d}:{i % 60:02d} {"ERROR" if i % 7 == 0 else "INFO"} '
+        f'request {i} served in {i % 300}ms'
+        for i in range(n)
+    ]
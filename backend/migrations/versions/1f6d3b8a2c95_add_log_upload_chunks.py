@@ -0,0 +1,39 @@
+"""add log upload chunks and alert chunk offset
+
+Revision ID: 1f6d3b8a2c95
+Revises: 4b8e1d6a3f57
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1f6d3b8a2c95'
+down_revision: Union[str, None] = '4b8e1d6a3f57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('log_upload_chunks',
+    sa.Column('log_upload_id', sa.UUID(), nullable=False),
+    sa.Column('chunk_offset', sa.BigInteger(), autoincrement=False, nullable=False),
+    sa.Column('bytes_processed', sa.BigInteger(), nullable=False),
+    sa.Column('lines_parsed', sa.Integer(), nullable=False),
+    sa.Column('lines_failed', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['log_upload_id'], ['log_uploads.id'], ),
+    sa.PrimaryKeyConstraint('log_upload_id', 'chunk_offset')
+    )
+    # Nullable with no default, so adding it does not rewrite log_alerts
+    op.add_column('log_alerts', sa.Column('chunk_offset', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('log_alerts', 'chunk_offset')
+    op.drop_table('log_upload_chunks')
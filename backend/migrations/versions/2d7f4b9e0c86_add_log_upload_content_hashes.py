@@ -0,0 +1,50 @@
+"""add log upload content hashes
+
+Revision ID: 2d7f4b9e0c86
+Revises: 6a1c9e4b7d30
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d7f4b9e0c86'
+down_revision: Union[str, None] = '6a1c9e4b7d30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema. Earlier uploads have no fingerprint and are never matched as duplicates."""
+    op.add_column('log_uploads', sa.Column('content_sha256', sa.String(length=64), nullable=True))
+    op.add_column('log_uploads', sa.Column('head_sha256', sa.String(length=64), nullable=True))
+    op.add_column('log_uploads', sa.Column('content_bytes', sa.BigInteger(), nullable=True))
+    op.add_column('log_uploads', sa.Column('base_upload_id', sa.UUID(), nullable=True))
+    op.create_foreign_key(
+        'log_uploads_base_upload_id_fkey', 'log_uploads', 'log_uploads', ['base_upload_id'], ['id'],
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_log_uploads_content_sha256', 'log_uploads', ['content_sha256'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_log_uploads_head_sha256', 'log_uploads', ['head_sha256'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_log_uploads_head_sha256', table_name='log_uploads', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_log_uploads_content_sha256', table_name='log_uploads', postgresql_concurrently=True, if_exists=True)
+    op.drop_constraint('log_uploads_base_upload_id_fkey', 'log_uploads', type_='foreignkey')
+    op.drop_column('log_uploads', 'base_upload_id')
+    op.drop_column('log_uploads', 'content_bytes')
+    op.drop_column('log_uploads', 'head_sha256')
+    op.drop_column('log_uploads', 'content_sha256')
@@ -0,0 +1,36 @@
+"""drop log entry message trigram index
+
+Revision ID: 4b8e1d6a3f57
+Revises: 9e3b5a7c2f14
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8e1d6a3f57'
+down_revision: Union[str, None] = '9e3b5a7c2f14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Message search goes through message_tsv and tagging happens at ingest, so nothing on
+    # PostgreSQL matches message with ILIKE or regexes any more; the index only slowed writes
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_log_entries_message_trgm', table_name='log_entries', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_log_entries_message_trgm', 'log_entries', ['message'],
+            postgresql_using='gin', postgresql_ops={'message': 'gin_trgm_ops'},
+            postgresql_concurrently=True, if_not_exists=True,
+        )
@@ -0,0 +1,50 @@
+"""add keyset pagination indexes
+
+Revision ID: 5e3f0a9c1d72
+Revises: d91f3c7b28e5
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e3f0a9c1d72'
+down_revision: Union[str, None] = 'd91f3c7b28e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset pages compare (timestamp, id); with id in the index the cursor is a pure range seek.
+    # A B-tree scans both ways, so (timestamp, id) also serves newest-first listings.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_log_entries_timestamp_id', 'log_entries', ['timestamp', 'id'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_log_entries_upload_timestamp_id', 'log_entries', ['log_upload_id', 'timestamp', 'id'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index('ix_log_entries_timestamp_desc', table_name='log_entries', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_log_entries_upload_timestamp', table_name='log_entries', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_log_entries_upload_timestamp', 'log_entries', ['log_upload_id', 'timestamp'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_log_entries_timestamp_desc', 'log_entries', [sa.text('timestamp DESC')],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index('ix_log_entries_upload_timestamp_id', table_name='log_entries', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_log_entries_timestamp_id', table_name='log_entries', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,44 @@
+"""add log alerts
+
+Revision ID: 6a1c9e4b7d30
+Revises: f0b2d8a6c417
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a1c9e4b7d30'
+down_revision: Union[str, None] = 'f0b2d8a6c417'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('log_alerts',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('detected_at', sa.DateTime(), nullable=False),
+    sa.Column('minute', sa.DateTime(), nullable=False),
+    sa.Column('source', sa.String(), nullable=True),
+    sa.Column('level', sa.String(), nullable=False),
+    sa.Column('template_id', sa.BigInteger(), nullable=True),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('expected', sa.Float(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('log_upload_id', sa.UUID(), nullable=True),
+    sa.ForeignKeyConstraint(['log_upload_id'], ['log_uploads.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id')
+    )
+    op.create_index('ix_log_alerts_minute', 'log_alerts', ['minute'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_log_alerts_minute', table_name='log_alerts')
+    op.drop_table('log_alerts')
@@ -0,0 +1,36 @@
+"""add upload progress columns
+
+Revision ID: 7c2e9d41a5b3
+Revises: 364203f16dcc
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e9d41a5b3'
+down_revision: Union[str, None] = '364203f16dcc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('log_uploads', sa.Column('status', sa.String(), server_default='completed', nullable=False))
+    op.add_column('log_uploads', sa.Column('bytes_total', sa.BigInteger(), nullable=True))
+    op.add_column('log_uploads', sa.Column('bytes_processed', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('log_uploads', sa.Column('stats', sa.JSON(), nullable=True))
+    op.add_column('log_uploads', sa.Column('error', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('log_uploads', 'error')
+    op.drop_column('log_uploads', 'stats')
+    op.drop_column('log_uploads', 'bytes_processed')
+    op.drop_column('log_uploads', 'bytes_total')
+    op.drop_column('log_uploads', 'status')
@@ -0,0 +1,40 @@
+"""add log entry search vector
+
+Revision ID: 8b6c4e2f0a17
+Revises: 5e3f0a9c1d72
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b6c4e2f0a17'
+down_revision: Union[str, None] = '5e3f0a9c1d72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A stored generated column is filled by every INSERT and COPY, so ingest code needs no changes.
+    # Adding it rewrites log_entries once.
+    op.execute(
+        "ALTER TABLE log_entries ADD COLUMN IF NOT EXISTS message_tsv tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('simple', message)) STORED"
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_log_entries_message_tsv', 'log_entries', ['message_tsv'],
+            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_log_entries_message_tsv', table_name='log_entries', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('log_entries', 'message_tsv')
@@ -0,0 +1,29 @@
+"""add log entry chunk offset
+
+Revision ID: 9e3b5a7c2f14
+Revises: 2d7f4b9e0c86
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e3b5a7c2f14'
+down_revision: Union[str, None] = '2d7f4b9e0c86'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable with no default, so adding it does not rewrite log_entries
+    op.add_column('log_entries', sa.Column('chunk_offset', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('log_entries', 'chunk_offset')
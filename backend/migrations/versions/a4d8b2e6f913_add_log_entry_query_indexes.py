@@ -0,0 +1,51 @@
+"""add log entry query indexes
+
+Revision ID: a4d8b2e6f913
+Revises: 7c2e9d41a5b3
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d8b2e6f913'
+down_revision: Union[str, None] = '7c2e9d41a5b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CONCURRENTLY cannot run inside a transaction, and avoids locking writes on large tables
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_log_entries_upload_timestamp', 'log_entries', ['log_upload_id', 'timestamp'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_log_entries_timestamp_desc', 'log_entries', [sa.text('timestamp DESC')],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_log_entries_level_timestamp', 'log_entries', ['level', 'timestamp'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_log_entries_message_trgm', 'log_entries', ['message'],
+            postgresql_using='gin', postgresql_ops={'message': 'gin_trgm_ops'},
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_log_entries_message_trgm', table_name='log_entries', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_log_entries_level_timestamp', table_name='log_entries', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_log_entries_timestamp_desc', table_name='log_entries', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_log_entries_upload_timestamp', table_name='log_entries', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,31 @@
+"""add log entry tags
+
+Revision ID: c3a7e5d91b24
+Revises: 8b6c4e2f0a17
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a7e5d91b24'
+down_revision: Union[str, None] = '8b6c4e2f0a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable with no default, so existing rows are not rewritten; they stay untagged (NULL) until
+    # `python -m app.services.keywords backfill`, and reports match them at query time meanwhile
+    op.add_column('log_entries', sa.Column('tags', postgresql.ARRAY(sa.String()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('log_entries', 'tags')
@@ -0,0 +1,34 @@
+"""add log_counts_hourly rollup
+
+Revision ID: d91f3c7b28e5
+Revises: a4d8b2e6f913
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd91f3c7b28e5'
+down_revision: Union[str, None] = 'a4d8b2e6f913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema. Existing entries are backfilled with `python -m app.services.rollup rebuild`."""
+    op.create_table('log_counts_hourly',
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('level', sa.String(), nullable=False),
+    sa.Column('log_upload_id', sa.UUID(), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('bucket_start', 'level', 'log_upload_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('log_counts_hourly')
@@ -0,0 +1,41 @@
+"""add log templates
+
+Revision ID: f0b2d8a6c417
+Revises: c3a7e5d91b24
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f0b2d8a6c417'
+down_revision: Union[str, None] = 'c3a7e5d91b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema. Existing entries get templates with `python -m app.services.templates backfill`."""
+    op.add_column('log_entries', sa.Column('template_id', sa.BigInteger(), nullable=True))
+    op.create_table('log_templates',
+    sa.Column('id', sa.BigInteger(), autoincrement=False, nullable=False),
+    sa.Column('template', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('log_template_counts',
+    sa.Column('log_upload_id', sa.UUID(), nullable=False),
+    sa.Column('template_id', sa.BigInteger(), autoincrement=False, nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('log_upload_id', 'template_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('log_template_counts')
+    op.drop_table('log_templates')
+    op.drop_column('log_entries', 'template_id')